@@ -0,0 +1,161 @@
+import hmac
+from datetime import date, datetime, time, timedelta
+
+from flask import (Blueprint, Response, abort, current_app, render_template, request, redirect, url_for, session,
+                   flash, stream_with_context)
+from sqlalchemy import func
+
+from models import db, Service, User, Work, Enquiry, Booking
+from api import ENQUIRY_FIELDS, WORK_FIELDS
+from auth import login_required
+from cache import content_cache
+from export import EXPORT_CHUNK_SIZE, FORMATS, csv_stream, export_chunks, ndjson_stream
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, metrics
+from ratelimit import rate_limiter
+
+bp = Blueprint('admin', __name__)
+
+# --- Admin Routes ---
+@bp.route('/admin/login', methods=['GET', 'POST'])
+def admin_login():
+    if request.method == 'POST':
+        username = request.form.get('username')
+        password = request.form.get('password')
+        # Checked before the password hash, so a burst of attempts can't tie up workers
+        wait = rate_limiter.login_attempt(request.remote_addr, username)
+        if wait:
+            flash(f'Too many login attempts. Please try again in {wait} seconds.', 'error')
+            return render_template('admin/login.html'), 429, {'Retry-After': str(wait)}
+        user = User.query.filter_by(username=username).first() if username else None
+        if user and password and user.check_password(password):
+            session['admin_logged_in'] = True
+            return redirect(url_for('admin.admin_dashboard'))
+        else:
+            flash('Invalid credentials', 'error')
+    return render_template('admin/login.html')
+
+@bp.route('/admin/logout')
+def admin_logout():
+    session.pop('admin_logged_in', None)
+    return redirect(url_for('admin.admin_login'))
+
+@bp.route('/admin/dashboard')
+@login_required
+def admin_dashboard():
+    # Counts only; each section loads its rows from the paginated API when opened
+    service_counts = status_counts(Service)
+    work_counts = status_counts(Work)
+    enquiry_counts = status_counts(Enquiry)
+    booking_counts = status_counts(Booking)
+
+    return render_template('admin/dashboard.html',
+                           services_count=sum(service_counts.values()),
+                           works_count=sum(work_counts.values()),
+                           enquiries_count=sum(enquiry_counts.values()),
+                           pending_enquiries_count=enquiry_counts.get('New', 0),
+                           bookings_count=sum(booking_counts.values()))
+
+def status_counts(model):
+    rows = db.session.query(model.status, func.count()).group_by(model.status).all()
+    return {status: count for status, count in rows}
+
+
+# --- Admin Services CRUD (New Requirements) ---
+@bp.route('/admin/services')
+@login_required
+def admin_services_list():
+    services = Service.query.all()
+    return render_template('admin/services.html', services=services)
+
+@bp.route('/admin/services/add', methods=['GET', 'POST'])
+@login_required
+def admin_services_add():
+    if request.method == 'POST':
+        title = request.form['title']
+        description = request.form['description']
+        status = request.form['status'] # User said must be ACTIVE (uppercase)
+        icon = request.form.get('icon', 'fa-check')
+        
+        new_service = Service(
+            title=title,
+            short_desc=description,
+            full_desc=description,
+            icon=icon,
+            status=status
+        )
+        db.session.add(new_service)
+        db.session.commit()
+        content_cache.bump()
+        return redirect(url_for('admin.admin_services_list'))
+    return render_template('admin/add_service.html')
+
+@bp.route('/admin/services/delete/<int:id>', methods=['POST'])
+@login_required
+def admin_services_delete(id):
+    service = Service.query.get_or_404(id)
+    db.session.delete(service)
+    db.session.commit()
+    content_cache.bump()
+    return redirect(url_for('admin.admin_services_list'))
+
+
+# --- Metrics ---
+@bp.route('/admin/metrics')
+def admin_metrics():
+    # Prometheus can't log in, so a bearer token is accepted as well as the session
+    token = current_app.config['METRICS_TOKEN']
+    authorized = 'admin_logged_in' in session or (
+        # Bytes, since compare_digest rejects non-ASCII str and headers may carry any
+        token and hmac.compare_digest(request.headers.get('Authorization', '').encode(), f'Bearer {token}'.encode()))
+    if not authorized:
+        return Response('Unauthorized\n', 401, {'WWW-Authenticate': 'Bearer'}, mimetype='text/plain')
+    return Response(metrics.render(), content_type=METRICS_CONTENT_TYPE, headers={'Cache-Control': 'no-store'})
+
+
+# --- Streaming Exports ---
+EXPORT_WORK_FIELDS = {name: WORK_FIELDS[name] for name in
+                      ('id', 'title', 'category', 'location', 'date', 'description', 'image', 'status', 'createdAt')}
+
+@bp.route('/admin/export/enquiries')
+@login_required
+def admin_export_enquiries():
+    filters = date_range_filters(Enquiry.date, lambda day: datetime.combine(day, time.min))
+    if request.args.get('status'):
+        filters.append(Enquiry.status == request.args['status'])
+    return export_response('enquiries', ENQUIRY_FIELDS, filters, [Enquiry.id])
+
+@bp.route('/admin/export/works')
+@login_required
+def admin_export_works():
+    filters = date_range_filters(Work.created_at, lambda day: datetime.combine(day, time.min))
+    if request.args.get('status'):
+        filters.append(Work.status == request.args['status'].upper())
+    if request.args.get('category'):
+        filters.append(Work.category == request.args['category'])
+    return export_response('works', EXPORT_WORK_FIELDS, filters, [Work.id])
+
+def date_range_filters(column, bound):
+    """?from=YYYY-MM-DD&to=YYYY-MM-DD, both inclusive."""
+    filters = []
+    try:
+        if request.args.get('from'):
+            filters.append(column >= bound(date.fromisoformat(request.args['from'])))
+        if request.args.get('to'):
+            filters.append(column < bound(date.fromisoformat(request.args['to']) + timedelta(days=1)))
+    except ValueError:
+        abort(400, 'from and to must be YYYY-MM-DD dates')
+    return filters
+
+def export_response(name, field_map, filters, order_by):
+    fmt = request.args.get('format', 'csv')
+    if fmt not in FORMATS:
+        abort(400, f"format must be one of: {', '.join(FORMATS)}")
+    names = list(field_map)
+    chunks = export_chunks(db.session, field_map, filters, order_by,
+                           current_app.config.get('EXPORT_CHUNK_SIZE', EXPORT_CHUNK_SIZE))
+    stream = csv_stream(names, chunks) if fmt == 'csv' else ndjson_stream(names, chunks)
+    response = Response(stream_with_context(stream), mimetype=FORMATS[fmt])
+    filename = f"{name}-{date.today().strftime('%Y%m%d')}.{fmt}"
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
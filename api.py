@@ -0,0 +1,501 @@
+import hashlib
+from datetime import date, timedelta
+
+from flask import Blueprint, current_app, jsonify, make_response, request
+from sqlalchemy import func, select, tuple_
+
+from models import db, Service, Work, Enquiry, Booking
+from auth import login_required
+from availability import availability
+from cache import content_cache
+from images import image_store
+from batch import apply_batch
+from dates import parse_date
+from public import warm_pages
+from pagination import BadRequest, decode_cursor, encode_cursor, keyset_page, page_limit, requested_fields
+from search import SEARCH_INDEXES, search
+from serializers import cached_json
+from settings import site_settings
+from sync import changed_rows, clock, deleted_ids
+
+bp = Blueprint('api', __name__)
+
+# --- API Routes for Dashboard SPA ---
+# Field maps for the listing APIs: API name -> (column, converter)
+SERVICE_FIELDS = {
+    'id': (Service.id, None),
+    'title': (Service.title, None),
+    'shortDesc': (Service.short_desc, None),
+    'fullDesc': (Service.full_desc, None),
+    'icon': (Service.icon, None),
+    'image': (Service.image, None),
+    'active': (Service.status, lambda status: status == 'ACTIVE'),
+    'order': (Service.order, None),
+    'status': (Service.status, None),
+}
+
+WORK_FIELDS = {
+    'id': (Work.id, None),
+    'title': (Work.title, None),
+    'category': (Work.category, None),
+    'location': (Work.location, None),
+    'date': (Work.date, lambda day: day.isoformat() if day else None),
+    'description': (Work.description, None),
+    'image': (Work.image, None),
+    'active': (Work.status, lambda status: status == 'VISIBLE'),
+    'status': (Work.status, None),
+    'createdAt': (Work.created_at, lambda ts: ts.strftime('%Y-%m-%d %H:%M:%S') if ts else None),
+    'thumbnail': (Work.image, lambda image: image_store.image_url(image, 'thumb')),
+}
+
+ENQUIRY_FIELDS = {
+    'id': (Enquiry.id, None),
+    'name': (Enquiry.name, None),
+    'email': (Enquiry.email, None),
+    'subject': (Enquiry.subject, None),
+    'message': (Enquiry.message, None),
+    'date': (Enquiry.date, lambda date: date.isoformat() if date else None),
+    'status': (Enquiry.status, None),
+}
+
+BOOKING_FIELDS = {
+    'id': (Booking.id, None),
+    'client_name': (Booking.client_name, None),
+    'email': (Booking.email, None),
+    'phone': (Booking.phone, None),
+    'event_type': (Booking.event_type, None),
+    'date': (Booking.start_date, lambda day: day.isoformat()),
+    'end_date': (Booking.end_date, lambda day: day.isoformat()),
+    'location': (Booking.location, None),
+    'details': (Booking.details, None),
+    'status': (Booking.status, None),
+}
+
+SEARCH_SOURCES = {
+    'works': (Work, WORK_FIELDS),
+    'services': (Service, SERVICE_FIELDS),
+    'enquiries': (Enquiry, ENQUIRY_FIELDS),
+}
+
+# Collections the admin SPA mirrors locally: name -> (model, table, fields)
+SYNC_SOURCES = {
+    'services': (Service, 'services', SERVICE_FIELDS),
+    'works': (Work, 'works', WORK_FIELDS),
+    'enquiries': (Enquiry, 'enquiry', ENQUIRY_FIELDS),
+}
+
+@bp.errorhandler(BadRequest)
+def handle_bad_request(e):
+    return {"status": "error", "message": str(e)}, 400
+
+@bp.route('/api/services', methods=['GET'])
+def api_get_services():
+    # Keyset pagination over (order, id), served by ix_services_status_order;
+    # unchanged pages are served pre-encoded until the next content bump
+    filters = []
+    if request.args.get('status'):
+        filters.append(Service.status == request.args['status'].upper())
+
+    def build():
+        services, next_cursor = keyset_page(
+            db.session, SERVICE_FIELDS, requested_fields(SERVICE_FIELDS),
+            key_columns=[(Service.order, False), (Service.id, False)],
+            filters=filters,
+            after=lambda c: tuple_(Service.order, Service.id) > tuple_(*c),
+            limit=page_limit())
+        return {"services": services, "next_cursor": next_cursor}
+    return cached_json(build)
+
+@bp.route('/api/services', methods=['POST'])
+@login_required
+def api_save_service():
+    data = request.json
+    service_id = data.get('id')
+    
+    if service_id and str(service_id).startswith('svc_'):
+        # This is a temp ID from the SPA, treat as new
+        service = None
+    elif service_id:
+        service = Service.query.get(service_id)
+    else:
+        service = None
+        
+    if not service:
+        service = Service()
+        db.session.add(service)
+        
+    for key, value in service_values(data).items():
+        setattr(service, key, value)
+    
+    db.session.commit()
+    content_cache.bump()
+    warm_pages()
+    return {"status": "success", "id": service.id}
+
+def service_values(data):
+    # Map the SPA's service shape onto model columns
+    return {
+        'title': data.get('title'),
+        'short_desc': data.get('shortDesc'),
+        'full_desc': data.get('fullDesc'),
+        'icon': data.get('icon'),
+        'image': data.get('image'),
+        'order': service_order(data.get('order')),
+        'status': 'ACTIVE' if data.get('active') else 'INACTIVE',
+    }
+
+def service_order(value):
+    # NULL orders would fall out of the (order, id) keyset on later pages
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        raise BadRequest('order must be an integer')
+
+@bp.route('/api/services/batch', methods=['POST'])
+@login_required
+def api_batch_services():
+    ok, results = apply_batch(db.session, Service, request.json or {}, 'svc_', service_values,
+                              order_column='order')
+    if not ok:
+        return {"status": "error", "results": results}, 400
+    content_cache.bump()
+    warm_pages()
+    return {"status": "success", "results": results}
+
+@bp.route('/api/services/<int:id>', methods=['DELETE'])
+@login_required
+def api_delete_service(id):
+    service = Service.query.get_or_404(id)
+    db.session.delete(service)
+    db.session.commit()
+    content_cache.bump()
+    warm_pages()
+    return {"status": "success"}
+
+@bp.route('/api/works', methods=['GET'])
+def api_get_works():
+    # Newest first; keyset on id, served by ix_works_status_id
+    filters = []
+    if request.args.get('status'):
+        filters.append(Work.status == request.args['status'].upper())
+    if request.args.get('category'):
+        filters.append(Work.category == request.args['category'])
+
+    def build():
+        works, next_cursor = keyset_page(
+            db.session, WORK_FIELDS, requested_fields(WORK_FIELDS),
+            key_columns=[(Work.id, True)],
+            filters=filters,
+            after=lambda c: Work.id < c[0],
+            limit=page_limit())
+        return {"works": works, "next_cursor": next_cursor}
+    return cached_json(build)
+
+# --- Work Archive ---
+# Visible works by event date; every query is a range scan on ix_works_status_date
+def dated_works(start=None, end=None):
+    """Visible works with start <= date < end, oldest first, as a cached keyset page."""
+    filters = [Work.status == 'VISIBLE', Work.date.is_not(None)]
+    if start:
+        filters.append(Work.date >= start)
+    if end:
+        filters.append(Work.date < end)
+
+    def build():
+        works, next_cursor = keyset_page(
+            db.session, WORK_FIELDS, requested_fields(WORK_FIELDS),
+            key_columns=[(Work.date, False), (Work.id, False)],
+            filters=filters,
+            after=lambda c: tuple_(Work.date, Work.id) > tuple_(cursor_date(c[0]), c[1]),
+            limit=page_limit())
+        return {"works": works, "next_cursor": next_cursor}
+    return cached_json(build)
+
+def cursor_date(value):
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise BadRequest('Invalid cursor')
+
+@bp.route('/api/works/archive', methods=['GET'])
+def api_works_archive():
+    # Month counts straight off the (status, date) index, newest first
+    def build():
+        month = func.substr(Work.date, 1, 7).label('month')
+        rows = db.session.execute(
+            select(month, func.count())
+            .where(Work.status == 'VISIBLE', Work.date.is_not(None))
+            .group_by(month)
+            .order_by(month.desc())).all()
+        years = {}
+        for key, count in rows:
+            year = years.setdefault(int(key[:4]), {"year": int(key[:4]), "count": 0, "months": []})
+            year["count"] += count
+            year["months"].append({"month": int(key[5:7]), "count": count})
+        return {"years": list(years.values())}
+    return cached_json(build)
+
+@bp.route('/api/works/archive/<int:year>', methods=['GET'])
+@bp.route('/api/works/archive/<int:year>/<int:month>', methods=['GET'])
+def api_works_archive_period(year, month=None):
+    if not 1 <= year < 9999 or (month is not None and not 1 <= month <= 12):
+        raise BadRequest('Invalid year or month')
+    if month is None:
+        return dated_works(date(year, 1, 1), date(year + 1, 1, 1))
+    next_month = date(year + month // 12, month % 12 + 1, 1)
+    return dated_works(date(year, month, 1), next_month)
+
+@bp.route('/api/works/range', methods=['GET'])
+def api_works_range():
+    # ?from=&to= (inclusive, YYYY-MM-DD); omit to for everything upcoming from a date
+    try:
+        start = date.fromisoformat(request.args['from']) if request.args.get('from') else None
+        end = date.fromisoformat(request.args['to']) if request.args.get('to') else None
+    except ValueError:
+        raise BadRequest('from and to must be YYYY-MM-DD dates')
+    if start and end and end < start:
+        raise BadRequest('to must be on or after from')
+    return dated_works(start, end + timedelta(days=1) if end else None)
+
+@bp.route('/api/works', methods=['POST'])
+@login_required
+def api_save_work():
+    data = request.json
+    work_id = data.get('id')
+    
+    if work_id and str(work_id).startswith('work_'):
+        work = None
+    elif work_id:
+        work = Work.query.get(work_id)
+    else:
+        work = None
+        
+    if not work:
+        work = Work()
+        db.session.add(work)
+        
+    for key, value in work_values(data).items():
+        setattr(work, key, value)
+    
+    db.session.commit()
+    content_cache.bump()
+    warm_pages()
+    return {"status": "success", "id": work.id}
+
+def work_date(value):
+    try:
+        return parse_date(value)
+    except ValueError:
+        raise BadRequest('date must be a YYYY-MM-DD date')
+
+def work_values(data):
+    # Map the SPA's work shape onto model columns
+    values = {
+        'title': data.get('title'),
+        'category': data.get('category'),
+        'location': data.get('location'),
+        'description': data.get('description'),
+        'image': data.get('image'),
+        'status': 'VISIBLE' if data.get('active') else 'HIDDEN',
+    }
+    # Clients that don't send a date keep the stored one rather than clearing it
+    if 'date' in data:
+        values['date'] = work_date(data['date'])
+    return values
+
+@bp.route('/api/works/batch', methods=['POST'])
+@login_required
+def api_batch_works():
+    ok, results = apply_batch(db.session, Work, request.json or {}, 'work_', work_values)
+    if not ok:
+        return {"status": "error", "results": results}, 400
+    content_cache.bump()
+    warm_pages()
+    return {"status": "success", "results": results}
+
+@bp.route('/api/works/<int:id>', methods=['DELETE'])
+@login_required
+def api_delete_work(id):
+    work = Work.query.get_or_404(id)
+    db.session.delete(work)
+    db.session.commit()
+    content_cache.bump()
+    warm_pages()
+    return {"status": "success"}
+
+@bp.route('/api/images', methods=['GET'])
+@login_required
+def api_get_images():
+    return {"images": image_store.list()}
+
+@bp.route('/api/images', methods=['POST'])
+@login_required
+def api_upload_images():
+    # Originals are stored by content hash; variants render in the image process pool
+    files = request.files.getlist('images') or request.files.getlist('image')
+    if not files:
+        raise BadRequest('No images uploaded')
+    return {"status": "success", "images": image_store.save_all(files)}, 201
+
+@bp.route('/api/enquiries', methods=['GET'])
+@login_required
+def api_get_enquiries():
+    # Newest first; keyset on id
+    filters = []
+    if request.args.get('status'):
+        filters.append(Enquiry.status == request.args['status'])
+    enquiries, next_cursor = keyset_page(
+        db.session, ENQUIRY_FIELDS, requested_fields(ENQUIRY_FIELDS),
+        key_columns=[(Enquiry.id, True)],
+        filters=filters,
+        after=lambda c: Enquiry.id < c[0],
+        limit=page_limit())
+    return {"enquiries": enquiries, "next_cursor": next_cursor}
+
+@bp.route('/api/search', methods=['GET'])
+@login_required
+def api_search():
+    # Ranked prefix search over the FTS5 indexes; the cursor is an offset into the ranking
+    kinds = [kind.strip() for kind in request.args.get('type', ','.join(SEARCH_INDEXES)).split(',') if kind.strip()]
+    unknown = [kind for kind in kinds if kind not in SEARCH_INDEXES]
+    if unknown or not kinds:
+        raise BadRequest(f"type must be one of: {', '.join(SEARCH_INDEXES)}")
+    offset = 0
+    if request.args.get('cursor'):
+        offset = decode_cursor(request.args['cursor'], [int])[0]
+        if offset < 0:
+            raise BadRequest('Invalid cursor')
+    limit = page_limit()
+    hits, has_more = search(db.session, kinds, request.args.get('q', ''), limit, offset)
+
+    records = {}
+    for kind in kinds:
+        ids = [rowid for hit_kind, rowid, _, _ in hits if hit_kind == kind]
+        if not ids:
+            continue
+        model, fields = SEARCH_SOURCES[kind]
+        rows = db.session.execute(select(*[column for column, _ in fields.values()]).where(model.id.in_(ids))).all()
+        for row in rows:
+            item = {name: convert(value) if convert else value
+                    for (name, (_, convert)), value in zip(fields.items(), row)}
+            records[kind, item['id']] = item
+
+    results = [
+        dict(records[kind, rowid], type=kind, snippet=snippet, score=round(score, 4))
+        for kind, rowid, snippet, score in hits if (kind, rowid) in records
+    ]
+    next_cursor = encode_cursor([offset + limit]) if has_more else None
+    return {"results": results, "next_cursor": next_cursor}
+
+@bp.route('/api/sync', methods=['GET'])
+@login_required
+def api_sync():
+    # Rows changed and deleted since the client's token; no token means everything
+    since = 0
+    if request.args.get('since'):
+        since = decode_cursor(request.args['since'], [int])[0]
+        if since < 0:
+            raise BadRequest('Invalid sync token')
+    latest, pruned = clock(db.session)
+    if since and since < pruned:
+        # Deletes the client has not seen were pruned; it has to start over
+        return {"reset": True, "token": None, "more": False}
+    limit = current_app.config.get('SYNC_PAGE_SIZE', 1000)
+
+    payload = {}
+    horizon = latest
+    for name, (model, table, fields) in SYNC_SOURCES.items():
+        columns = [column for column, _ in fields.values()]
+        changed = changed_rows(db.session, model, columns, since, limit + 1)
+        deleted = deleted_ids(db.session, table, since, limit + 1)
+        # Everything up to the last sequence number returned from a truncated list is complete
+        for rows in (changed, deleted):
+            if len(rows) > limit:
+                horizon = min(horizon, rows[limit - 1][0])
+        payload[name] = {
+            "changed": [
+                {key: convert(value) if convert else value for (key, (_, convert)), value in zip(fields.items(), row)}
+                for _, row in changed[:limit]
+            ],
+            "deleted": [row_id for _, row_id in deleted[:limit]],
+        }
+    payload["token"] = encode_cursor([horizon])
+    payload["more"] = horizon < latest
+    payload["reset"] = False
+    return payload
+
+@bp.route('/api/bookings', methods=['GET'])
+@login_required
+def api_get_bookings():
+    # Newest first; keyset on id
+    filters = []
+    if request.args.get('status'):
+        filters.append(Booking.status == request.args['status'])
+    bookings, next_cursor = keyset_page(
+        db.session, BOOKING_FIELDS, requested_fields(BOOKING_FIELDS),
+        key_columns=[(Booking.id, True)],
+        filters=filters,
+        after=lambda c: Booking.id < c[0],
+        limit=page_limit())
+    return {"bookings": bookings, "next_cursor": next_cursor}
+
+@bp.route('/api/bookings/<int:id>', methods=['PATCH'])
+@login_required
+def api_update_booking(id):
+    booking = Booking.query.get_or_404(id)
+    status = (request.json or {}).get('status')
+    if status not in ('Pending', 'Approved', 'Rejected'):
+        raise BadRequest('status must be Pending, Approved or Rejected')
+    booking.status = status
+    db.session.commit()
+    availability.bump()
+    return {"status": "success"}
+
+@bp.route('/api/settings', methods=['GET'])
+def api_get_settings():
+    # Clients revalidate with If-None-Match; the ETag changes only when settings are saved
+    etag = site_settings.etag()
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+    else:
+        response = jsonify(site_settings.all())
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    return response
+
+@bp.route('/api/settings', methods=['PUT', 'POST'])
+@login_required
+def api_save_settings():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        raise BadRequest('Expected a JSON object of settings')
+    site_settings.update(data)
+    return {"status": "success", "settings": site_settings.all()}
+
+@bp.route('/api/availability', methods=['GET'])
+def api_availability():
+    # Answered from the in-memory interval index; cheap enough for every date-picker change
+    try:
+        lo = date.fromisoformat(request.args.get('from') or date.today().isoformat())
+        hi = date.fromisoformat(request.args.get('to') or lo.isoformat())
+    except ValueError:
+        raise BadRequest('from and to must be YYYY-MM-DD dates')
+    if hi < lo or (hi - lo).days > 366:
+        raise BadRequest('to must be on or after from and at most a year later')
+
+    etag = hashlib.blake2b(f'{availability.version()}:{lo}:{hi}'.encode(), digest_size=12).hexdigest()
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+    else:
+        response = jsonify({
+            "from": lo.isoformat(),
+            "to": hi.isoformat(),
+            "capacity": current_app.config['BOOKING_DAILY_CAPACITY'],
+            "unavailable": [day.isoformat() for day in availability.unavailable_days(lo, hi)],
+        })
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = 0
+    response.cache_control.must_revalidate = True
+    return response
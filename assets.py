@@ -0,0 +1,123 @@
+"""Fingerprinted, precompressed static assets.
+
+``flask build-assets`` copies every file under static/ to
+``static/build/<dir>/<name>.<hash>.<ext>``, writes ``.gz`` (and ``.br`` when
+the brotli package is installed) siblings for text assets, and records the
+mapping in ``static/build/manifest.json``. With a manifest present,
+``url_for('static', filename='css/style.css')`` resolves to the fingerprinted
+name, which is served with a one-year immutable Cache-Control and the best
+precompressed encoding the client accepts. Without a manifest the stock
+static handler is used unchanged.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+
+from flask import current_app, request, send_from_directory
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BUILD_DIR = 'build'
+COMPRESSIBLE = {'.css', '.js', '.svg', '.json', '.txt', '.html', '.map'}
+# Preferred first when the client accepts several
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def build_assets(static_folder):
+    """Fingerprint and compress everything under static_folder. Returns the manifest."""
+    build_root = os.path.join(static_folder, BUILD_DIR)
+    manifest = {'files': {}, 'encodings': {}}
+    for root, dirs, files in os.walk(static_folder):
+        if os.path.abspath(root) == os.path.abspath(static_folder):
+            dirs[:] = [d for d in dirs if d != BUILD_DIR]
+        for name in sorted(files):
+            source = os.path.join(root, name)
+            rel = os.path.relpath(source, static_folder).replace(os.sep, '/')
+            with open(source, 'rb') as f:
+                data = f.read()
+            stem, ext = os.path.splitext(rel)
+            built = f'{BUILD_DIR}/{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}'
+            target = os.path.join(static_folder, built)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(source, target)
+            manifest['files'][rel] = built
+
+            if ext.lower() not in COMPRESSIBLE:
+                continue
+            encodings = []
+            for encoding, suffix in ENCODINGS:
+                if encoding == 'br':
+                    if brotli is None:
+                        continue
+                    compressed = brotli.compress(data, quality=11)
+                else:
+                    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+                # Tiny files can grow when compressed; serve those as is
+                if len(compressed) < len(data):
+                    with open(target + suffix, 'wb') as f:
+                        f.write(compressed)
+                    encodings.append(encoding)
+            if encodings:
+                manifest['encodings'][built] = encodings
+
+    os.makedirs(build_root, exist_ok=True)
+    path = os.path.join(build_root, 'manifest.json')
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(path + '.tmp', path)
+    return manifest
+
+
+class Assets:
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('ASSET_MANIFEST', os.path.join(app.static_folder, BUILD_DIR, 'manifest.json'))
+        app.config.setdefault('ASSET_MAX_AGE', 365 * 24 * 3600)
+        manifest = {'files': {}, 'encodings': {}}
+        if os.path.exists(app.config['ASSET_MANIFEST']):
+            with open(app.config['ASSET_MANIFEST']) as f:
+                manifest = json.load(f)
+        app.extensions['assets'] = manifest
+        if manifest['files']:
+            app.url_defaults(self.fingerprint)
+            self._static_view = app.view_functions['static']
+            app.view_functions['static'] = self.serve
+
+    def fingerprint(self, endpoint, values):
+        if endpoint == 'static' and 'filename' in values:
+            built = current_app.extensions['assets']['files'].get(values['filename'])
+            if built:
+                values['filename'] = built
+
+    def serve(self, filename):
+        manifest = current_app.extensions['assets']
+        if not filename.startswith(BUILD_DIR + '/'):
+            return self._static_view(filename=filename)
+
+        mimetype = mimetypes.guess_type(filename)[0]
+        encoding, suffix = None, ''
+        for name, ext in ENCODINGS:
+            if name in manifest['encodings'].get(filename, ()) and request.accept_encodings[name]:
+                encoding, suffix = name, ext
+                break
+        response = send_from_directory(current_app.static_folder, filename + suffix, mimetype=mimetype,
+                                       max_age=current_app.config['ASSET_MAX_AGE'])
+        if encoding:
+            response.content_encoding = encoding
+        if filename in manifest['encodings']:
+            response.vary.add('Accept-Encoding')
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+
+assets = Assets()
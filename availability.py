@@ -0,0 +1,139 @@
+"""Booking availability answered from a sorted in-memory interval index.
+
+Bookings are whole-day intervals [start_date, end_date] no longer than
+BOOKING_MAX_DAYS. Because of that bound, every interval overlapping a
+window starts inside [window_start - max_days + 1, window_end]. Both the
+in-memory index (bisect over sorted starts) and the SQL check (a range
+scan on ix_bookings_start_end) look only at that slice.
+
+The index is rebuilt when the bookings version stamp changes, so every
+worker sees a new booking on its next availability check.
+"""
+import bisect
+import os
+import threading
+from collections import Counter
+from datetime import date, timedelta
+
+from flask import current_app
+from sqlalchemy import select, text
+
+from cache import VersionStamp
+from models import db, Booking
+
+ACTIVE_STATUSES = ('Pending', 'Approved')
+
+
+class IntervalIndex:
+    def __init__(self, intervals, max_days):
+        self.intervals = sorted(intervals)
+        self.starts = [start for start, _ in self.intervals]
+        self.max_days = max_days
+
+    def overlapping(self, lo, hi):
+        left = bisect.bisect_left(self.starts, lo - timedelta(days=self.max_days - 1))
+        right = bisect.bisect_right(self.starts, hi)
+        return [(start, end) for start, end in self.intervals[left:right] if end >= lo]
+
+    def booked_days(self, lo, hi):
+        return day_counts(self.overlapping(lo, hi), lo, hi)
+
+
+def day_counts(intervals, lo, hi):
+    counts = Counter()
+    for start, end in intervals:
+        day = max(start, lo)
+        while day <= min(end, hi):
+            counts[day] += 1
+            day += timedelta(days=1)
+    return counts
+
+
+class _AvailabilityState:
+    def __init__(self, stamp):
+        self.stamp = stamp
+        self.version = None
+        self.index = None
+        self.lock = threading.Lock()
+
+
+class Availability:
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('BOOKING_DAILY_CAPACITY', 1)
+        app.config.setdefault('BOOKING_MAX_DAYS', 7)
+        os.makedirs(app.instance_path, exist_ok=True)
+        path = app.config.setdefault(
+            'BOOKING_VERSION_FILE', os.path.join(app.instance_path, 'bookings.version'))
+        app.extensions['availability'] = _AvailabilityState(VersionStamp(path))
+
+    @property
+    def _state(self):
+        return current_app.extensions['availability']
+
+    def version(self):
+        return self._state.stamp.current()
+
+    def bump(self):
+        return self._state.stamp.bump()
+
+    def index(self):
+        state = self._state
+        version = state.stamp.current()
+        if state.version != version:
+            with state.lock:
+                if state.version != version:
+                    # Past bookings can never affect a future date, so keep only the rest
+                    rows = db.session.execute(
+                        select(Booking.start_date, Booking.end_date)
+                        .where(Booking.status.in_(ACTIVE_STATUSES), Booking.end_date >= date.today())
+                    ).all()
+                    state.index = IntervalIndex([tuple(row) for row in rows], current_app.config['BOOKING_MAX_DAYS'])
+                    state.version = version
+        return state.index
+
+    def unavailable_days(self, lo, hi):
+        capacity = current_app.config['BOOKING_DAILY_CAPACITY']
+        counts = self.index().booked_days(lo, hi)
+        return sorted(day for day, count in counts.items() if count >= capacity)
+
+    def conflicts(self, session, lo, hi):
+        """Authoritative SQL check, run inside the booking's write transaction."""
+        max_days = current_app.config['BOOKING_MAX_DAYS']
+        rows = session.execute(
+            select(Booking.start_date, Booking.end_date)
+            .where(Booking.start_date.between(lo - timedelta(days=max_days - 1), hi),
+                   Booking.end_date >= lo,
+                   Booking.status.in_(ACTIVE_STATUSES))
+        ).all()
+        capacity = current_app.config['BOOKING_DAILY_CAPACITY']
+        counts = day_counts([tuple(row) for row in rows], lo, hi)
+        return sorted(day for day, count in counts.items() if count >= capacity)
+
+
+def create_booking(session, **fields):
+    """Insert a booking unless its dates are full. Returns (booking, conflicts).
+
+    BEGIN IMMEDIATE takes SQLite's write lock before the conflict check, so
+    two workers cannot both see a free day and book it.
+    """
+    session.execute(text('BEGIN IMMEDIATE'))
+    try:
+        conflicts = availability.conflicts(session, fields['start_date'], fields['end_date'])
+        if conflicts:
+            session.rollback()
+            return None, conflicts
+        booking = Booking(**fields)
+        session.add(booking)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    availability.bump()
+    return booking, []
+
+
+availability = Availability()
@@ -0,0 +1,76 @@
+from sqlalchemy import delete, insert, select, update
+
+from pagination import BadRequest
+
+
+def apply_batch(session, model, data, temp_prefix, values_for, order_column=None):
+    """Apply a batch of upserts, deletes and order changes in one transaction.
+
+    Items whose id is missing or starts with temp_prefix are inserted, the
+    rest are updated by primary key. Returns (ok, results) where results
+    holds one entry per item; nothing is written unless every item is valid.
+    """
+    upserts = data.get('upserts') or []
+    deletes = data.get('deletes') or []
+    order = data.get('order') or []
+    results = []
+    errors = False
+
+    if order and order_column is None:
+        return False, [{"op": "order", "error": "Ordering is not supported"}]
+
+    inserts, updates, known_ids = [], [], set()
+    try:
+        for item in upserts:
+            item_id = item.get('id')
+            try:
+                values = values_for(item)
+            except BadRequest as e:
+                results.append({"op": "upsert", "id": item_id, "error": str(e)})
+                errors = True
+                continue
+            if not values.get('title'):
+                results.append({"op": "upsert", "id": item_id, "error": "title is required"})
+                errors = True
+            elif not item_id or str(item_id).startswith(temp_prefix):
+                inserts.append((item_id, values))
+            else:
+                updates.append({'id': int(item_id), **values})
+        delete_ids = [int(item_id) for item_id in deletes]
+        order_rows = [{'id': int(item['id']), order_column: int(item['order'])} for item in order]
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return False, results + [{"op": "batch", "error": "Invalid id or order value"}]
+
+    # One lookup validates every id referenced by updates, deletes and reorders
+    referenced = {row['id'] for row in updates + order_rows} | set(delete_ids)
+    if referenced:
+        known_ids = set(session.scalars(select(model.id).where(model.id.in_(referenced))))
+    for op, ids in (("upsert", [row['id'] for row in updates]), ("delete", delete_ids),
+                    ("order", [row['id'] for row in order_rows])):
+        for missing in [item_id for item_id in ids if item_id not in known_ids]:
+            results.append({"op": op, "id": missing, "error": "not found"})
+            errors = True
+    if errors:
+        return False, results
+
+    try:
+        if inserts:
+            new_ids = session.scalars(
+                insert(model).returning(model.id, sort_by_parameter_order=True),
+                [values for _, values in inserts]).all()
+            results.extend({"op": "upsert", "tempId": temp_id, "id": new_id}
+                           for (temp_id, _), new_id in zip(inserts, new_ids))
+        if updates:
+            session.execute(update(model), updates)
+            results.extend({"op": "upsert", "id": row['id']} for row in updates)
+        if order_rows:
+            session.execute(update(model), order_rows)
+            results.extend({"op": "order", "id": row['id']} for row in order_rows)
+        if delete_ids:
+            session.execute(delete(model).where(model.id.in_(delete_ids)))
+            results.extend({"op": "delete", "id": item_id} for item_id in delete_ids)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return True, results
@@ -0,0 +1 @@
+"""Performance benchmarks. Run a module with ``python -m benchmarks.<name>``."""
@@ -0,0 +1,81 @@
+"""Diff two benchmarks.load result files and flag regressions.
+
+Exits 1 if any route got slower (p50/p95/p99), lost throughput or grew
+peak RSS by more than --threshold relative to the baseline.
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 0.10
+"""
+import argparse
+import json
+import sys
+
+# metric -> True if a higher value is better
+METRICS = {
+    'p50_ms': False,
+    'p95_ms': False,
+    'p99_ms': False,
+    'rps': True,
+    'peak_rss_mb': False,
+}
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline, candidate, threshold):
+    """Return (rows, regressions); rows are (scale, route, metric, old, new, change)."""
+    rows, regressions = [], []
+    for scale, routes in candidate['results'].items():
+        for route, stats in routes.items():
+            old_stats = baseline['results'].get(scale, {}).get(route)
+            if not old_stats:
+                continue
+            for metric, higher_is_better in METRICS.items():
+                old, new = old_stats.get(metric), stats.get(metric)
+                if not old or new is None:
+                    continue
+                change = (new - old) / old
+                row = (scale, route, metric, old, new, change)
+                rows.append(row)
+                worse = -change if higher_is_better else change
+                if worse > threshold:
+                    regressions.append(row)
+            if stats.get('errors', 0) > old_stats.get('errors', 0):
+                regressions.append((scale, route, 'errors', old_stats.get('errors', 0), stats['errors'], None))
+    return rows, regressions
+
+
+def format_row(row):
+    scale, route, metric, old, new, change = row
+    change = '' if change is None else f'{change:+.1%}'
+    return f'{scale:>8} {route:18} {metric:12} {old:>10} {new:>10} {change:>8}'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='relative change that counts as a regression (default 0.10)')
+    args = parser.parse_args(argv)
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    print(f"baseline {baseline['meta'].get('commit')} vs candidate {candidate['meta'].get('commit')}")
+    rows, regressions = compare(baseline, candidate, args.threshold)
+    print(f"{'scale':>8} {'route':18} {'metric':12} {'baseline':>10} {'candidate':>10} {'change':>8}")
+    for row in rows:
+        print(format_row(row))
+
+    if regressions:
+        print(f'\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:')
+        for row in regressions:
+            print(format_row(row))
+        return 1
+    print('\nNo regressions.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
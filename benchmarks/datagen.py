@@ -0,0 +1,128 @@
+"""Deterministic synthetic datasets in a scratch SQLite file.
+
+The schema comes from the real app (create_all plus migrations, so FTS and
+sync triggers are in place) and rows are bulk-inserted from a seeded RNG,
+so the same arguments always produce the same database.
+
+    python -m benchmarks.datagen --works 10000 --enquiries 10000 --out /tmp/bench.db
+"""
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+CATEGORIES = ('Wedding', 'Corporate', 'Birthday', 'Gala', 'Conference', 'Concert')
+LOCATIONS = ('Grand Hotel', 'Beach Club', 'City Hall', 'Rooftop Garden', 'Country Estate')
+WORDS = ('elegant evening celebration guests music floral lighting dinner stage dance '
+         'catering venue design memorable luxury outdoor reception ceremony').split()
+CHUNK = 5000
+
+
+def scratch_config(directory, db_path):
+    """App config that keeps every file the app writes inside directory."""
+    return {
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        'CONTENT_VERSION_FILE': os.path.join(directory, 'content.version'),
+        'SETTINGS_VERSION_FILE': os.path.join(directory, 'settings.version'),
+        'BOOKING_VERSION_FILE': os.path.join(directory, 'bookings.version'),
+        'ENQUIRY_SPOOL_DIR': os.path.join(directory, 'spool'),
+        'MEDIA_DIR': os.path.join(directory, 'media'),
+        'RATE_LIMIT_DB': os.path.join(directory, 'ratelimit.db'),
+        'JOBS_DB': os.path.join(directory, 'jobs.db'),
+    }
+
+
+def sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def work_rows(rng, count):
+    start = datetime(2020, 1, 1)
+    for i in range(count):
+        day = start + timedelta(hours=i * 3)
+        yield {
+            'title': f'{rng.choice(CATEGORIES)} {sentence(rng, 2)[:-1]} #{i}',
+            'category': rng.choice(CATEGORIES),
+            'location': rng.choice(LOCATIONS),
+            'date': day.date(),
+            'description': sentence(rng, 40),
+            'image': f'https://picsum.photos/seed/{i}/800/600',
+            'status': 'VISIBLE' if rng.random() < 0.9 else 'HIDDEN',
+            'created_at': day,
+        }
+
+
+def enquiry_rows(rng, count):
+    start = datetime(2020, 1, 1)
+    for i in range(count):
+        yield {
+            'name': f'Client {i}',
+            'email': f'client{i}@example.com',
+            'subject': sentence(rng, 4),
+            'message': sentence(rng, 60),
+            'date': start + timedelta(minutes=i * 7),
+            'status': rng.choice(('New', 'Read', 'Replied')),
+        }
+
+
+def service_rows(rng, count):
+    for i in range(count):
+        yield {
+            'title': f'{rng.choice(CATEGORIES)} Planning {i}',
+            'short_desc': sentence(rng, 8),
+            'full_desc': sentence(rng, 80),
+            'icon': 'fa-star',
+            'status': 'ACTIVE' if rng.random() < 0.8 else 'INACTIVE',
+            'order': i,
+        }
+
+
+def bulk_insert(session, model, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= CHUNK:
+            session.execute(insert(model), batch)
+            batch = []
+    if batch:
+        session.execute(insert(model), batch)
+    session.commit()
+
+
+def generate(db_path, works, enquiries, services=12, seed=42):
+    """Create db_path with the app schema and the requested row counts."""
+    from app import create_app, init_db
+    from models import db, Enquiry, Service, Work
+
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    app = create_app(scratch_config(os.path.dirname(os.path.abspath(db_path)), db_path))
+    rng = random.Random(seed)
+    with app.app_context():
+        init_db()
+        bulk_insert(db.session, Service, service_rows(rng, services))
+        bulk_insert(db.session, Work, work_rows(rng, works))
+        bulk_insert(db.session, Enquiry, enquiry_rows(rng, enquiries))
+        db.engine.dispose()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--works', type=int, default=10000)
+    parser.add_argument('--enquiries', type=int, default=10000)
+    parser.add_argument('--services', type=int, default=12)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', required=True)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    generate(args.out, args.works, args.enquiries, args.services, args.seed)
+    print(f'Wrote {args.out} in {time.perf_counter() - started:.1f}s')
+
+
+if __name__ == '__main__':
+    main()
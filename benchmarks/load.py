@@ -0,0 +1,189 @@
+"""Route latency and throughput under concurrent clients, at several data scales.
+
+For each scale a synthetic database is generated (see benchmarks.datagen),
+then every route is driven in-process through the WSGI app by N client
+threads for a fixed number of requests. Results are p50/p95/p99 latency,
+requests/s, error count and the peak RSS seen while the route ran, and
+can be written as JSON for benchmarks.compare.
+
+    python -m benchmarks.load --scales 100,10000 --clients 8 --requests 400 --json results.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from benchmarks.datagen import generate, scratch_config
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name -> (method, path, json body factory or None, needs admin login)
+ROUTES = {
+    'home': ('GET', '/', None, False),
+    'works': ('GET', '/works', None, False),
+    'admin_dashboard': ('GET', '/admin/dashboard', None, True),
+    'api_get_works': ('GET', '/api/works?limit=100', None, True),
+    'api_save_service': ('POST', '/api/services', lambda i: {
+        'title': f'Bench service {i}', 'shortDesc': 'Benchmark', 'active': True, 'order': i}, True),
+}
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def rss_bytes():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        # Not Linux: fall back to the lifetime peak
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class RssSampler(threading.Thread):
+    def __init__(self, interval=0.01):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = rss_bytes()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.peak = max(self.peak, rss_bytes())
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        return max(self.peak, rss_bytes())
+
+
+def make_client(app, admin):
+    client = app.test_client()
+    if admin:
+        client.post('/admin/login', data={'username': 'admin', 'password': 'admin'})
+    return client
+
+
+def drive(app, route, clients, requests, warmup):
+    method, path, body, admin = ROUTES[route]
+    counter = iter(range(requests))
+    lock = threading.Lock()
+    latencies, errors = [], []
+
+    def client_loop():
+        client = make_client(app, admin)
+        for i in range(warmup):
+            client.open(path, method=method, json=body(-i - 1) if body else None)
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            started = time.perf_counter()
+            response = client.open(path, method=method, json=body(i) if body else None)
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                if response.status_code >= 400:
+                    errors.append(response.status_code)
+
+    sampler = RssSampler()
+    sampler.start()
+    threads = [threading.Thread(target=client_loop) for _ in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    peak = sampler.stop()
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'rps': round(len(latencies) / wall, 1),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'peak_rss_mb': round(peak / 1e6, 1),
+    }
+
+
+def run_scale(scale, args):
+    from app import create_app
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        started = time.perf_counter()
+        generate(db_path, works=scale, enquiries=scale, seed=args.seed)
+        print(f'scale {scale}: generated in {time.perf_counter() - started:.1f}s', file=sys.stderr)
+        # Every client logs in as admin; keep the login rate limit out of the way
+        app = create_app(dict(scratch_config(tmp, db_path), LOGIN_IP_BURST=10 ** 6, LOGIN_USER_BURST=10 ** 6))
+        results = {}
+        for route in args.routes:
+            results[route] = drive(app, route, args.clients, args.requests, args.warmup)
+            print(f"scale {scale:>7} {route:18} {results[route]['rps']:>9} req/s  "
+                  f"p50={results[route]['p50_ms']}ms p95={results[route]['p95_ms']}ms "
+                  f"p99={results[route]['p99_ms']}ms rss={results[route]['peak_rss_mb']}MB "
+                  f"errors={results[route]['errors']}")
+        with app.app_context():
+            from models import db
+            db.engine.dispose()
+    return results
+
+
+def metadata(args):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'args': {key: value for key, value in vars(args).items() if key != 'json'},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', default='100,10000',
+                        help='comma-separated works/enquiries counts, e.g. 100,10000,100000')
+    parser.add_argument('--routes', default=','.join(ROUTES), help='comma-separated subset of: ' + ', '.join(ROUTES))
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=400, help='measured requests per route')
+    parser.add_argument('--warmup', type=int, default=2, help='unmeasured requests per client first')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args(argv)
+    args.scales = [int(scale) for scale in args.scales.split(',')]
+    args.routes = [route.strip() for route in args.routes.split(',') if route.strip()]
+    unknown = [route for route in args.routes if route not in ROUTES]
+    if unknown:
+        parser.error(f"unknown routes: {', '.join(unknown)}")
+
+    results = {str(scale): run_scale(scale, args) for scale in args.scales}
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'meta': metadata(args), 'results': results}, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""Login rate limiter overhead, and what a rejected attempt costs next to a hashed one.
+
+``limiter`` runs N processes charging buckets in the shared SQLite store,
+as gunicorn workers would, half on one hot key and half on their own.
+``login`` posts wrong passwords to /admin/login through the test client,
+once with the limit out of reach (every attempt pays the password hash)
+and once over the limit (every attempt gets a 429 before hashing).
+
+    python -m benchmarks.login --processes 4 --seconds 3 --attempts 50
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.datagen import scratch_config
+
+
+def percentiles(latencies):
+    latencies = sorted(latencies)
+    if not latencies:
+        return {'p50_us': None, 'p95_us': None}
+    return {
+        'p50_us': round(statistics.median(latencies) * 1e6, 1),
+        'p95_us': round(latencies[max(0, int(len(latencies) * 0.95) - 1)] * 1e6, 1),
+    }
+
+
+def limiter_worker(tmp, index, start_at, deadline, queue):
+    from app import create_app
+    from ratelimit import rate_limiter
+
+    app = create_app(scratch_config(tmp, os.path.join(tmp, 'bench.db')))
+    latencies = []
+    # Start together once every process has booted, so checks/s covers exactly --seconds
+    time.sleep(max(0.0, start_at - time.time()))
+    with app.app_context():
+        while time.time() < deadline:
+            # Shared keys contend across processes; private ones only with themselves
+            ident = 'shared' if len(latencies) % 2 else f'worker-{index}'
+            started = time.perf_counter()
+            rate_limiter.take('bench', ident, 10, 60)
+            latencies.append(time.perf_counter() - started)
+    queue.put(latencies)
+
+
+def bench_limiter(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = multiprocessing.Queue()
+        start_at = time.time() + 2.0
+        deadline = start_at + args.seconds
+        procs = [multiprocessing.Process(target=limiter_worker, args=(tmp, i, start_at, deadline, queue))
+                 for i in range(args.processes)]
+        for proc in procs:
+            proc.start()
+        results = [queue.get() for _ in procs]
+        for proc in procs:
+            proc.join()
+    latencies = [latency for result in results for latency in result]
+    return dict({'checks': len(latencies), 'checks_per_sec': round(len(latencies) / args.seconds, 1)},
+                **percentiles(latencies))
+
+
+def bench_login(args):
+    from app import create_app, init_db
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        for mode, burst in (('hashed', 10 ** 6), ('rejected', 1)):
+            config = dict(scratch_config(tmp, db_path), LOGIN_IP_BURST=burst, LOGIN_IP_PER_MINUTE=1,
+                          LOGIN_USER_BURST=burst, LOGIN_USER_PER_MINUTE=1,
+                          RATE_LIMIT_DB=os.path.join(tmp, f'{mode}.db'))
+            app = create_app(config)
+            with app.app_context():
+                init_db()
+            client = app.test_client()
+            form = {'username': 'admin', 'password': 'wrong'}
+            client.post('/admin/login', data=form)  # warm up; also spends the single token
+            latencies, statuses = [], {}
+            started = time.perf_counter()
+            for _ in range(args.attempts):
+                t0 = time.perf_counter()
+                status = client.post('/admin/login', data=form).status_code
+                latencies.append(time.perf_counter() - t0)
+                statuses[status] = statuses.get(status, 0) + 1
+            wall = time.perf_counter() - started
+            results[mode] = dict({'attempts_per_sec': round(args.attempts / wall, 1), 'statuses': statuses},
+                                 **percentiles(latencies))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=3)
+    parser.add_argument('--attempts', type=int, default=50, help='login posts per mode')
+    parser.add_argument('--json', help='also write results to this file')
+    args = parser.parse_args(argv)
+
+    results = {'limiter': bench_limiter(args), 'login': bench_login(args)}
+    limiter = results['limiter']
+    print(f"limiter  {args.processes} procs  {limiter['checks_per_sec']:>10} checks/s  "
+          f"p50={limiter['p50_us']}us p95={limiter['p95_us']}us")
+    for mode, stats in results['login'].items():
+        print(f"login    {mode:9} {stats['attempts_per_sec']:>10} attempts/s  "
+              f"p50={stats['p50_us']}us p95={stats['p95_us']}us  statuses={stats['statuses']}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
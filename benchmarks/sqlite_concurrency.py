@@ -0,0 +1,128 @@
+"""Concurrent read/write throughput with and without the SQLite engine profile.
+
+Each worker is a separate process, like a gunicorn worker: readers run the
+home page listing query and writers update and insert works rows, each in
+its own transaction.
+
+    python -m benchmarks.sqlite_concurrency --readers 4 --writers 2 --seconds 5
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+import sqlite_profile
+
+SCHEMA = """
+CREATE TABLE works (
+    id INTEGER PRIMARY KEY,
+    title VARCHAR(100) NOT NULL,
+    category VARCHAR(50),
+    location VARCHAR(100),
+    description TEXT,
+    status VARCHAR(20)
+)
+"""
+READ_SQL = text("SELECT id, title, category, location FROM works WHERE status = 'VISIBLE' "
+                "ORDER BY id DESC LIMIT 20")
+
+
+def make_engine(path, profile):
+    uri = f'sqlite:///{path}'
+    if profile == 'default':
+        return create_engine(uri)
+    engine = create_engine(uri, **sqlite_profile.engine_options(uri, {}))
+    sqlite_profile.apply_pragmas(engine, sqlite_profile.DEFAULT_PRAGMAS)
+    return engine
+
+
+def seed(path, rows):
+    engine = create_engine(f'sqlite:///{path}')
+    with engine.begin() as conn:
+        conn.execute(text(SCHEMA))
+        conn.execute(text('CREATE INDEX ix_works_status_id ON works (status, id)'))
+        conn.execute(
+            text("INSERT INTO works (title, category, location, description, status) "
+                 "VALUES (:title, 'Wedding', 'Grand Hotel', :description, 'VISIBLE')"),
+            [{'title': f'Work {i}', 'description': 'x' * 200} for i in range(rows)])
+    engine.dispose()
+
+
+def worker(path, profile, role, deadline, rows, queue):
+    engine = make_engine(path, profile)
+    ops, errors, latencies = 0, 0, []
+    i = 0
+    while time.time() < deadline:
+        started = time.perf_counter()
+        try:
+            with engine.begin() as conn:
+                if role == 'reader':
+                    conn.execute(READ_SQL).all()
+                else:
+                    conn.execute(text('UPDATE works SET title = :title WHERE id = :id'),
+                                 {'title': f'Edited {i}', 'id': i % rows + 1})
+                    conn.execute(text("INSERT INTO works (title, status) VALUES ('New', 'HIDDEN')"))
+            ops += 1
+            latencies.append(time.perf_counter() - started)
+        except OperationalError:
+            errors += 1
+        i += 1
+    engine.dispose()
+    queue.put((role, ops, errors, latencies))
+
+
+def run_profile(profile, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        seed(path, args.rows)
+        queue = multiprocessing.Queue()
+        deadline = time.time() + 0.5 + args.seconds
+        roles = ['reader'] * args.readers + ['writer'] * args.writers
+        procs = [multiprocessing.Process(target=worker, args=(path, profile, role, deadline, args.rows, queue))
+                 for role in roles]
+        for proc in procs:
+            proc.start()
+        results = [queue.get() for _ in procs]
+        for proc in procs:
+            proc.join()
+
+    summary = {}
+    for role in ('reader', 'writer'):
+        ops = sum(r[1] for r in results if r[0] == role)
+        latencies = sorted(l for r in results if r[0] == role for l in r[3])
+        summary[role] = {
+            'ops_per_sec': round(ops / args.seconds, 1),
+            'errors': sum(r[2] for r in results if r[0] == role),
+            'p50_ms': round(statistics.median(latencies) * 1000, 3) if latencies else None,
+            'p95_ms': round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 3) if latencies else None,
+        }
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--json', help='also write results to this file')
+    args = parser.parse_args(argv)
+
+    results = {profile: run_profile(profile, args) for profile in ('default', 'tuned')}
+    for profile, summary in results.items():
+        for role, stats in summary.items():
+            print(f"{profile:8} {role:7} {stats['ops_per_sec']:>10} ops/s  errors={stats['errors']:<5} "
+                  f"p50={stats['p50_ms']}ms p95={stats['p95_ms']}ms")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
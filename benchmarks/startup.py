@@ -0,0 +1,84 @@
+"""Cold start to first response, measured in fresh interpreter processes.
+
+Each run spawns a new Python process, imports the app module's dependencies,
+then the app module itself (whose only real work is the module-level
+``app = create_app()`` build gunicorn relies on) and serves one request
+through the test client. The ``legacy`` mode also
+runs init_db() before the first request, which is what every worker boot
+used to pay when app.py initialised the database on import.
+
+    python -m benchmarks.startup --runs 10 --path /
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Importing app also builds one, so its dependencies are imported first and
+# timed on their own; the import of app itself is then the cold app build
+CHILD = """
+import ast, importlib, json, sys, time
+tree = ast.parse(open('app.py').read())
+deps = [alias.name for node in tree.body if isinstance(node, ast.Import) for alias in node.names]
+deps += [node.module for node in tree.body if isinstance(node, ast.ImportFrom)]
+t0 = time.perf_counter()
+for name in deps:
+    importlib.import_module(name)
+t1 = time.perf_counter()
+import app as app_module
+t2 = time.perf_counter()
+app, init_db = app_module.app, app_module.init_db
+if sys.argv[1] == 'legacy':
+    with app.app_context():
+        init_db()
+t3 = time.perf_counter()
+status = app.test_client().get(sys.argv[2]).status_code
+t4 = time.perf_counter()
+print(json.dumps({'import': t1 - t0, 'create_app': t2 - t1, 'init_db': t3 - t2,
+                  'first_request': t4 - t3, 'status': status}))
+"""
+
+
+def run_once(mode, path, env):
+    started = time.perf_counter()
+    out = subprocess.run([sys.executable, '-c', CHILD, mode, path], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    result['total'] = time.perf_counter() - started
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--path', default='/')
+    parser.add_argument('--json', help='also write results to this file')
+    args = parser.parse_args(argv)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'startup.db')}")
+        # Schema must exist for the factory-only runs, as it would after `flask init-db`
+        run_once('legacy', args.path, env)
+        for mode in ('factory', 'legacy'):
+            runs = [run_once(mode, args.path, env) for _ in range(args.runs)]
+            results[mode] = {key: round(statistics.median(r[key] for r in runs) * 1000, 2)
+                             for key in ('import', 'create_app', 'init_db', 'first_request', 'total')}
+
+    print(f"{'mode':8} {'import':>8} {'create':>8} {'init_db':>8} {'first':>8} {'total':>8}  (median ms)")
+    for mode, stats in results.items():
+        print(f"{mode:8} {stats['import']:8} {stats['create_app']:8} {stats['init_db']:8} "
+              f"{stats['first_request']:8} {stats['total']:8}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
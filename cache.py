@@ -0,0 +1,174 @@
+import hashlib
+import os
+import threading
+import time
+from functools import wraps
+from types import SimpleNamespace
+
+from flask import current_app, request, session
+
+
+class VersionStamp:
+    """Content version shared by every worker on the host.
+
+    The version lives in a tiny file next to the instance data. Bumping
+    atomically replaces the file, so all gunicorn workers see the new
+    value on their next read without a database round trip.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def current(self):
+        try:
+            with open(self.path) as f:
+                return f.read().strip() or '0'
+        except FileNotFoundError:
+            return '0'
+
+    def bump(self):
+        version = f'{time.time_ns():x}-{os.getpid():x}'
+        # Per thread too: threaded servers can bump concurrently within one process
+        tmp_path = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(version)
+        os.replace(tmp_path, self.path)
+        return version
+
+
+class _CacheState:
+    def __init__(self, stamp):
+        self.stamp = stamp
+        self.entries = {}
+        self.lock = threading.Lock()
+        # key -> lock held while that key is being loaded
+        self.loading = {}
+        self.page_stamps = []
+
+    def page_version(self):
+        return ':'.join([self.stamp.current()] + [stamp.current() for stamp in self.page_stamps])
+
+
+class ContentCache:
+    """Read-through cache for listing queries, invalidated by a VersionStamp."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        os.makedirs(app.instance_path, exist_ok=True)
+        path = app.config.setdefault(
+            'CONTENT_VERSION_FILE', os.path.join(app.instance_path, 'content.version'))
+        app.config.setdefault('PAGE_CACHE_MAX_AGE', 0)
+        app.config.setdefault('PAGE_CACHE_MAX_ENTRIES', 2000)
+        app.extensions['content_cache'] = _CacheState(VersionStamp(path))
+
+    @property
+    def _state(self):
+        return current_app.extensions['content_cache']
+
+    def add_page_dependency(self, app, stamp):
+        """Also re-render cached pages whenever stamp changes."""
+        app.extensions['content_cache'].page_stamps.append(stamp)
+
+    def version(self):
+        return self._state.stamp.current()
+
+    def bump(self):
+        state = self._state
+        with state.lock:
+            state.entries.clear()
+        return state.stamp.bump()
+
+    def get(self, key, loader, capped=False):
+        """Cached loader() for key. With capped, a new key is not stored once the
+        cache holds PAGE_CACHE_MAX_ENTRIES, so keys built from request input
+        can't grow it without bound."""
+        state = self._state
+        version = state.stamp.current()
+        entry = state.entries.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        if capped and entry is None and len(state.entries) >= current_app.config['PAGE_CACHE_MAX_ENTRIES']:
+            return loader()
+        # Misses on one key wait for a single load; other keys are not held up by it
+        with state.lock:
+            key_lock = state.loading.setdefault(key, threading.Lock())
+        with key_lock:
+            try:
+                # Another thread may have filled the entry while we waited
+                entry = state.entries.get(key)
+                if entry is not None and entry[0] == version:
+                    return entry[1]
+                value = loader()
+                with state.lock:
+                    state.entries[key] = (version, value)
+                return value
+            finally:
+                with state.lock:
+                    if state.loading.get(key) is key_lock:
+                        del state.loading[key]
+
+    def page(self, view):
+        """Cache the rendered body of a public GET view per content version.
+
+        Entries are keyed by endpoint and query string, so alias routes share
+        one body. The strong ETag is a digest of that body and repeat requests
+        carrying it get a 304 without rendering. Once PAGE_CACHE_MAX_ENTRIES
+        is reached, pages with query strings render uncached until the next
+        bump, so arbitrary query strings can't grow the cache.
+        """
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or _has_flashes():
+                return view(*args, **kwargs)
+            state = self._state
+            version = state.page_version()
+            key = ('page', request.endpoint, tuple(sorted(request.args.items(multi=True))))
+            entry = state.entries.get(key)
+            if entry is None or entry[0] != version:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                if key[2] and key not in state.entries and \
+                        len(state.entries) >= current_app.config['PAGE_CACHE_MAX_ENTRIES']:
+                    return response
+                body = response.get_data()
+                page = _CachedPage(body, response.mimetype, hashlib.blake2b(body, digest_size=16).hexdigest())
+                state.entries[key] = entry = (version, page)
+            page = entry[1]
+            response = current_app.response_class(page.body, mimetype=page.mimetype)
+            response.set_etag(page.etag)
+            response.cache_control.public = True
+            response.cache_control.max_age = current_app.config['PAGE_CACHE_MAX_AGE']
+            response.cache_control.must_revalidate = True
+            return response.make_conditional(request)
+        return wrapper
+
+
+class _CachedPage:
+    __slots__ = ('body', 'mimetype', 'etag')
+
+    def __init__(self, body, mimetype, etag):
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = etag
+
+
+def _has_flashes():
+    # Pages showing flashed messages are per-visitor and must not be cached
+    if current_app.config['SESSION_COOKIE_NAME'] not in request.cookies:
+        return False
+    return '_flashes' in session
+
+
+def snapshot(rows):
+    """Copy ORM rows into plain objects that outlive their session."""
+    return [
+        SimpleNamespace(**{attr.key: getattr(row, attr.key) for attr in row.__mapper__.column_attrs})
+        for row in rows
+    ]
+
+
+content_cache = ContentCache()
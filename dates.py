@@ -0,0 +1,39 @@
+"""Parsing for the free-form date strings older rows and imports carry."""
+from datetime import date, datetime
+
+DATE_FORMATS = ('%Y/%m/%d', '%d %B %Y', '%d %b %Y', '%B %d, %Y', '%b %d, %Y', '%B %d %Y', '%b %d %Y')
+
+
+def parse_date(value):
+    """date from a date, datetime or string; None for blanks. Raises ValueError if unparseable."""
+    if value is None or isinstance(value, date) and not isinstance(value, datetime):
+        return value
+    if isinstance(value, datetime):
+        return value.date()
+    text = str(value).strip()
+    if not text:
+        return None
+    try:
+        return datetime.fromisoformat(text).date()
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f'Unrecognized date: {text!r}')
+
+
+def parse_datetime(value):
+    """datetime from a datetime, date or string; date-only values become midnight."""
+    if value is None or isinstance(value, datetime):
+        return value
+    text = str(value).strip()
+    if not text:
+        return None
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        day = parse_date(text)
+        return datetime(day.year, day.month, day.day)
@@ -0,0 +1,73 @@
+"""``{% cache key, version %}`` fragment caching for Jinja templates.
+
+    {% cache ('work-card', work.id), work.sync_seq %} ... {% endcache %}
+
+The rendered block is kept in a per-app LRU under key and reused while
+version is unchanged, so a listing re-rendered after one row changes only
+re-renders that row's card. A version of None renders without caching,
+since it can't tell a changed row from an unchanged one.
+"""
+import threading
+from collections import OrderedDict
+
+from jinja2 import nodes
+from jinja2.ext import Extension
+
+
+class FragmentStore:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, version):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] != version:
+                return None
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, version, value):
+        with self.lock:
+            self.entries[key] = (version, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class FragmentCacheExtension(Extension):
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=None)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        key = parser.parse_expression()
+        parser.stream.expect('comma')
+        version = parser.parse_expression()
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        return nodes.CallBlock(self.call_method('_cached', [key, version]), [], [], body).set_lineno(lineno)
+
+    def _cached(self, key, version, caller):
+        store = self.environment.fragment_cache
+        if store is None or version is None:
+            return caller()
+        value = store.get(key, version)
+        if value is None:
+            value = caller()
+            store.set(key, version, value)
+        return value
+
+
+def init_app(app):
+    app.config.setdefault('FRAGMENT_CACHE_SIZE', 5000)
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    store = app.jinja_env.fragment_cache = FragmentStore(app.config['FRAGMENT_CACHE_SIZE'])
+    app.extensions['fragment_cache'] = store
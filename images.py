@@ -0,0 +1,211 @@
+"""Uploaded images: content-hashed originals plus resized variants.
+
+An upload is stored once as ``<digest>.<ext>`` under MEDIA_DIR, where digest
+is the SHA-256 of its bytes, and a process pool renders WebP and JPEG copies
+at each VARIANTS width as ``<digest>-<variant>-<width>.<format>``. A name
+never changes content, so /media/ is served with immutable cache headers.
+With IMAGE_RENDER_IN_WORKER the upload returns once the original is stored
+and the job worker renders the variants, then bumps the content version so
+cached pages switch from the original to them.
+
+Work.image and Service.image refer to uploads as ``media/<digest>.<ext>``;
+external URLs and static/ filenames keep working as before.
+"""
+import hashlib
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from flask import current_app, send_from_directory, url_for
+
+from cache import VersionStamp
+from jobs import job_queue, task
+from pagination import BadRequest
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # uploads are stored, but no variants are generated
+    Image = None
+
+VARIANTS = {'thumb': 320, 'card': 800, 'hero': 1600}
+FORMATS = (('webp', 'WEBP'), ('jpg', 'JPEG'))
+EXTENSIONS = {'JPEG': 'jpg', 'PNG': 'png', 'WEBP': 'webp', 'GIF': 'gif'}
+MEDIA_PREFIX = 'media/'
+
+
+def variant_name(digest, variant, ext):
+    return f'{digest}-{variant}-{VARIANTS[variant]}.{ext}'
+
+
+def render_variants(path, digest, out_dir, quality):
+    """Write every variant of one original. Runs in a pool process."""
+    with Image.open(path) as original:
+        image = ImageOps.exif_transpose(original).convert('RGB')
+    for variant, width in VARIANTS.items():
+        resized = image.copy()
+        # thumbnail() only ever shrinks, so small originals are not upscaled
+        resized.thumbnail((width, width * 4), Image.LANCZOS)
+        for ext, fmt in FORMATS:
+            target = os.path.join(out_dir, variant_name(digest, variant, ext))
+            if os.path.exists(target):
+                continue
+            tmp = f'{target}.{os.getpid()}.tmp'
+            resized.save(tmp, fmt, quality=quality, optimize=True, **({'progressive': True} if fmt == 'JPEG' else {}))
+            os.replace(tmp, target)
+    return digest
+
+
+@task('render_image', concurrency=4, max_attempts=3, backoff=10, pool='process')
+def render_image(payload):
+    render_variants(payload['path'], payload['digest'], payload['out_dir'], payload['quality'])
+    # Cached pages still point at the original; re-render them with the variants
+    if payload.get('version_file'):
+        VersionStamp(payload['version_file']).bump()
+
+
+class _MediaState:
+    def __init__(self, app):
+        self.media_dir = app.config['MEDIA_DIR']
+        self.workers = app.config['IMAGE_WORKERS']
+        self.pool = None
+        self.pid = None
+        self.variants = {}
+
+    def executor(self):
+        # Pools do not survive fork; each worker process starts its own. Children
+        # are spawned rather than forked from a threaded server process.
+        if self.pool is None or self.pid != os.getpid():
+            self.pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+            self.pid = os.getpid()
+        return self.pool
+
+
+class ImageStore:
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('MEDIA_DIR', os.path.join(app.instance_path, 'media'))
+        app.config.setdefault('MEDIA_MAX_AGE', 365 * 24 * 3600)
+        app.config.setdefault('IMAGE_WORKERS', None)  # default: one per CPU
+        app.config.setdefault('IMAGE_QUALITY', 80)
+        app.config.setdefault('IMAGE_MAX_BYTES', 15 * 1024 * 1024)
+        app.config.setdefault('IMAGE_RENDER_IN_WORKER', False)
+        os.makedirs(app.config['MEDIA_DIR'], exist_ok=True)
+        if Image is None:
+            app.logger.warning('Pillow is not installed; uploads are stored without resized variants')
+        app.extensions['images'] = _MediaState(app)
+        app.add_url_rule('/media/<path:filename>', 'media', self.serve)
+        app.add_template_global(self.image_url)
+        app.add_template_global(self.image_variants)
+
+    @property
+    def _state(self):
+        return current_app.extensions['images']
+
+    def serve(self, filename):
+        response = send_from_directory(self._state.media_dir, filename,
+                                       max_age=current_app.config['MEDIA_MAX_AGE'])
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+    def save_all(self, files):
+        """Store uploads and render their variants in parallel, or queue them. Returns image dicts."""
+        state = self._state
+        stored = [self._store_original(state, f) for f in files]
+        if Image is not None and current_app.config['IMAGE_RENDER_IN_WORKER']:
+            config = current_app.config
+            for digest, path in stored:
+                job_queue.enqueue('render_image', {
+                    'path': path, 'digest': digest, 'out_dir': state.media_dir, 'quality': config['IMAGE_QUALITY'],
+                    'version_file': config['CONTENT_VERSION_FILE']}, unique=True)
+        elif Image is not None:
+            quality = current_app.config['IMAGE_QUALITY']
+            futures = [state.executor().submit(render_variants, path, digest, state.media_dir, quality)
+                       for digest, path in stored]
+            for future in futures:
+                future.result()
+        return [self.describe(MEDIA_PREFIX + os.path.basename(path)) for _, path in stored]
+
+    def _store_original(self, state, file):
+        data = file.read(current_app.config['IMAGE_MAX_BYTES'] + 1)
+        if not data:
+            raise BadRequest('Empty upload')
+        if len(data) > current_app.config['IMAGE_MAX_BYTES']:
+            raise BadRequest('Image is too large')
+        ext = self._extension(file.filename, data)
+        digest = hashlib.sha256(data).hexdigest()[:20]
+        path = os.path.join(state.media_dir, f'{digest}.{ext}')
+        if not os.path.exists(path):
+            tmp = f'{path}.{os.getpid()}.tmp'
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        return digest, path
+
+    def _extension(self, filename, data):
+        if Image is None:
+            ext = os.path.splitext(filename or '')[1].lower().lstrip('.')
+            ext = 'jpg' if ext == 'jpeg' else ext
+            if ext not in EXTENSIONS.values():
+                raise BadRequest('Unsupported image type')
+            return ext
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                image.verify()
+                fmt = image.format
+        except Exception:
+            raise BadRequest(f'{filename or "Upload"} is not a valid image')
+        if fmt not in EXTENSIONS:
+            raise BadRequest('Unsupported image type')
+        return EXTENSIONS[fmt]
+
+    def list(self):
+        """Uploaded originals, newest first."""
+        media_dir = self._state.media_dir
+        names = [name for name in os.listdir(media_dir)
+                 if '-' not in name and not name.endswith('.tmp')]
+        names.sort(key=lambda name: os.path.getmtime(os.path.join(media_dir, name)), reverse=True)
+        return [self.describe(MEDIA_PREFIX + name) for name in names]
+
+    def describe(self, value):
+        return {'image': value, 'url': self.image_url(value), 'variants': self.image_variants(value)}
+
+    def image_url(self, value, variant=None):
+        """URL for an image field: external URL, upload, or static/ filename."""
+        if not value:
+            return None
+        if value.startswith(('http://', 'https://', '//')):
+            return value
+        if value.startswith(MEDIA_PREFIX):
+            variants = self.image_variants(value)
+            if variant and variants:
+                return variants[variant]['jpg']
+            return url_for('media', filename=value[len(MEDIA_PREFIX):])
+        return url_for('static', filename=value)
+
+    def image_variants(self, value):
+        """{variant: {format: url}} plus srcset strings, or None if not rendered."""
+        if not value or not value.startswith(MEDIA_PREFIX):
+            return None
+        state = self._state
+        digest = value[len(MEDIA_PREFIX):].rsplit('.', 1)[0]
+        names = state.variants.get(digest)
+        if names is None:
+            names = {(variant, ext): variant_name(digest, variant, ext) for variant in VARIANTS for ext, _ in FORMATS}
+            if not all(os.path.exists(os.path.join(state.media_dir, name)) for name in names.values()):
+                return None
+            # Variant files are immutable once written, so remember them
+            state.variants[digest] = names
+        variants = {variant: {ext: url_for('media', filename=names[variant, ext]) for ext, _ in FORMATS}
+                    for variant in VARIANTS}
+        for ext, _ in FORMATS:
+            variants[f'{ext}_srcset'] = ', '.join(
+                f'{variants[variant][ext]} {width}w' for variant, width in VARIANTS.items())
+        return variants
+
+
+image_store = ImageStore()
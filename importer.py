@@ -0,0 +1,140 @@
+"""Bulk import of works and services from CSV, JSON or NDJSON files.
+
+Rows are validated and normalized in Python, then written with one
+executemany INSERT and one commit per batch, so large portfolios load in
+seconds instead of one round trip per row.
+
+    flask --app app import-data works portfolio.csv --batch-size 2000
+"""
+import csv
+import json
+import os
+import time
+
+from sqlalchemy import insert
+
+from dates import parse_date
+from models import db, Service, Work
+
+TRUE_VALUES = ('1', 'true', 'yes', 'y', 'on')
+
+
+class ImportSpec:
+    def __init__(self, model, columns, statuses, aliases):
+        self.model = model
+        # column -> accepted input keys, first match wins
+        self.columns = columns
+        self.statuses = statuses
+        self.aliases = aliases
+
+    @property
+    def default_status(self):
+        return self.statuses[0]
+
+
+IMPORTS = {
+    'works': ImportSpec(Work, {
+        'title': ('title',),
+        'category': ('category',),
+        'location': ('location',),
+        'date': ('date',),
+        'description': ('description',),
+        'image': ('image',),
+    }, ('VISIBLE', 'HIDDEN'), {'ACTIVE': 'VISIBLE', 'INACTIVE': 'HIDDEN'}),
+    'services': ImportSpec(Service, {
+        'title': ('title',),
+        'short_desc': ('short_desc', 'shortDesc'),
+        'full_desc': ('full_desc', 'fullDesc'),
+        'icon': ('icon',),
+        'image': ('image',),
+        'order': ('order',),
+    }, ('ACTIVE', 'INACTIVE'), {'VISIBLE': 'ACTIVE', 'HIDDEN': 'INACTIVE'}),
+}
+
+
+def read_records(path):
+    """Yield (line, dict) from a .csv, .json (array) or .ndjson/.jsonl file."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.csv':
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.DictReader(f)
+            for record in reader:
+                yield reader.line_num, record
+    elif ext in ('.ndjson', '.jsonl'):
+        with open(path, encoding='utf-8') as f:
+            for line, text in enumerate(f, 1):
+                if text.strip():
+                    yield line, json.loads(text)
+    elif ext == '.json':
+        with open(path, encoding='utf-8') as f:
+            for index, record in enumerate(json.load(f), 1):
+                yield index, record
+    else:
+        raise ValueError(f'Unsupported file type: {ext} (use .csv, .json or .ndjson)')
+
+
+def normalize(spec, record):
+    """Map one input record onto model columns. Raises ValueError if invalid."""
+    row = {}
+    for column, keys in spec.columns.items():
+        value = next((record[key] for key in keys if record.get(key) not in (None, '')), None)
+        row[column] = value.strip() if isinstance(value, str) else value
+    if not row['title']:
+        raise ValueError('title is required')
+    if 'date' in row:
+        row['date'] = parse_date(row['date'])
+    if 'order' in row:
+        try:
+            row['order'] = int(row['order'] or 0)
+        except (TypeError, ValueError):
+            raise ValueError(f"order must be an integer, got {row['order']!r}")
+
+    status = record.get('status')
+    if status not in (None, ''):
+        status = str(status).strip().upper()
+        status = spec.aliases.get(status, status)
+        if status not in spec.statuses:
+            raise ValueError(f"status must be one of {', '.join(spec.statuses)}, got {record['status']!r}")
+    elif record.get('active') not in (None, ''):
+        active = record['active']
+        if not isinstance(active, bool):
+            active = str(active).strip().lower() in TRUE_VALUES
+        status = spec.statuses[0] if active else spec.statuses[1]
+    else:
+        status = spec.default_status
+    row['status'] = status
+    return row
+
+
+def import_file(kind, path, batch_size=1000, log=print, max_errors=20):
+    """Import path into the kind table. Needs an app context. Returns (inserted, skipped, seconds)."""
+    spec = IMPORTS[kind]
+    stmt = insert(spec.model)
+    inserted = skipped = 0
+    batch = []
+    started = time.perf_counter()
+
+    def flush():
+        nonlocal inserted
+        db.session.execute(stmt, batch)
+        db.session.commit()
+        inserted += len(batch)
+        batch.clear()
+
+    for line, record in read_records(path):
+        try:
+            batch.append(normalize(spec, record))
+        except (ValueError, AttributeError) as e:
+            skipped += 1
+            if skipped <= max_errors:
+                log(f'Skipping record {line}: {e}')
+            continue
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+
+    elapsed = time.perf_counter() - started
+    rate = inserted / elapsed if elapsed else 0
+    log(f'Imported {inserted} {kind} ({skipped} skipped) in {elapsed:.2f}s, {rate:,.0f} rows/s')
+    return inserted, skipped, elapsed
@@ -0,0 +1,256 @@
+"""Write-behind ingestion for contact enquiries.
+
+Submissions are appended to a per-process spool file and put on a bounded
+in-memory queue, and the request returns straight away. A background
+thread drains the queue in batches with multi-row INSERTs. The spool
+segment behind a batch is deleted only after its INSERT commits, so
+anything not yet in the database survives a worker restart and is
+replayed by the next process that starts a flusher. Each committed batch
+queues one notification email for the job worker to send.
+"""
+import atexit
+import glob
+import json
+import os
+import queue
+import secrets
+import threading
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import insert
+
+from mailer import send_mail
+from models import db, Enquiry
+from settings import site_settings
+
+FIELDS = ('name', 'email', 'subject', 'message', 'date', 'status')
+
+
+class _IngestState:
+    def __init__(self, app):
+        self.app = app
+        self.spool_dir = app.config['ENQUIRY_SPOOL_DIR']
+        # Registrations survive fork, so this is not reset with the rest
+        self.exit_hook = False
+        self.reset()
+
+    def reset(self):
+        # Called again in a forked child: threads and locks do not survive fork
+        self.pid = os.getpid()
+        # Containers often restart with the same pid and instance dir; the nonce
+        # keeps a dead process's spool from being mistaken for this one's
+        self.boot = secrets.token_hex(4)
+        self.queue = queue.Queue(maxsize=self.app.config['ENQUIRY_QUEUE_SIZE'])
+        self.lock = threading.Lock()
+        self.recover_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.spool = None
+        self.segment_seq = 0
+        # Segments a flush is still inserting; recovery must leave them alone
+        self.in_flight = set()
+        self.thread = None
+
+    @property
+    def spool_path(self):
+        return os.path.join(self.spool_dir, f'enquiries-{self.pid}.{self.boot}.spool')
+
+    def segment_path(self, seq):
+        return os.path.join(self.spool_dir, f'enquiries-{self.pid}.{self.boot}-{seq}.segment')
+
+
+class EnquiryQueue:
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('ENQUIRY_QUEUE_SIZE', 1000)
+        app.config.setdefault('ENQUIRY_BATCH_SIZE', 200)
+        app.config.setdefault('ENQUIRY_FLUSH_INTERVAL', 1.0)
+        app.config.setdefault('ENQUIRY_SPOOL_FSYNC', False)
+        app.config.setdefault('ENQUIRY_NOTIFY', True)
+        app.config.setdefault('ENQUIRY_NOTIFY_TO', None)  # default: the site's contact email
+        app.config.setdefault('ENQUIRY_SPOOL_DIR', os.path.join(app.instance_path, 'spool'))
+        os.makedirs(app.config['ENQUIRY_SPOOL_DIR'], exist_ok=True)
+        app.extensions['enquiry_queue'] = _IngestState(app)
+
+    def _state(self):
+        state = current_app.extensions['enquiry_queue']
+        if state.pid != os.getpid():
+            state.reset()
+        return state
+
+    def submit(self, name, email, subject, message):
+        """Queue an enquiry. Returns False when the queue is full."""
+        state = self._state()
+        record = {
+            'name': name,
+            'email': email,
+            'subject': subject,
+            'message': message,
+            'date': datetime.utcnow().isoformat(),
+            'status': 'New',
+        }
+        with state.lock:
+            if state.queue.full():
+                return False
+            if state.spool is None:
+                state.spool = open(state.spool_path, 'a')
+            state.spool.write(json.dumps(record) + '\n')
+            state.spool.flush()
+            if state.app.config['ENQUIRY_SPOOL_FSYNC']:
+                os.fsync(state.spool.fileno())
+            state.queue.put_nowait(record)
+        self._ensure_flusher(state)
+        if state.queue.qsize() >= state.app.config['ENQUIRY_BATCH_SIZE']:
+            state.wakeup.set()
+        return True
+
+    def flush(self):
+        """Drain the queue synchronously. Used at exit and by the CLI."""
+        state = self._state()
+        _flush_once(state)
+        _recover_spool(state)
+
+    def _ensure_flusher(self, state):
+        if state.thread is not None and state.thread.is_alive():
+            return
+        with state.lock:
+            if state.thread is not None and state.thread.is_alive():
+                return
+            state.thread = threading.Thread(target=_flusher, args=(state,), name='enquiry-flusher', daemon=True)
+            state.thread.start()
+            if not state.exit_hook:
+                atexit.register(_flush_once, state)
+                state.exit_hook = True
+
+
+def _flusher(state):
+    _recover_spool(state)
+    interval = state.app.config['ENQUIRY_FLUSH_INTERVAL']
+    while True:
+        state.wakeup.wait(interval)
+        state.wakeup.clear()
+        try:
+            if not _flush_once(state):
+                # Earlier failures left segments behind; retry them while idle
+                _recover_spool(state)
+        except Exception:
+            state.app.logger.exception('Enquiry flush failed; the spool will be retried')
+
+
+def _flush_once(state):
+    """Move everything queued so far into the database. Returns rows written."""
+    with state.lock:
+        records = []
+        while True:
+            try:
+                records.append(state.queue.get_nowait())
+            except queue.Empty:
+                break
+        if not records:
+            return 0
+        # Every queued record was spooled under the same lock, so the spool
+        # rotated here holds exactly this batch
+        state.spool.close()
+        state.spool = None
+        state.segment_seq += 1
+        segment = state.segment_path(state.segment_seq)
+        os.replace(state.spool_path, segment)
+        state.in_flight.add(segment)
+
+    try:
+        _insert(state.app, records)
+        os.remove(segment)
+    finally:
+        # A failed insert leaves the segment for _recover_spool to retry
+        with state.lock:
+            state.in_flight.discard(segment)
+    return len(records)
+
+
+def _insert(app, records):
+    batch_size = app.config['ENQUIRY_BATCH_SIZE']
+    rows = [dict({field: record.get(field) for field in FIELDS}, date=datetime.fromisoformat(record['date']))
+            for record in records]
+    with app.app_context():
+        try:
+            for start in range(0, len(rows), batch_size):
+                db.session.execute(insert(Enquiry).values(rows[start:start + batch_size]))
+            db.session.commit()
+            if app.config['ENQUIRY_NOTIFY']:
+                _notify(app, records)
+        finally:
+            db.session.remove()
+
+
+def _notify(app, records):
+    # The rows are committed; a failure here must not make the spool replay them
+    try:
+        to = app.config['ENQUIRY_NOTIFY_TO'] or site_settings.all()['email']
+        if len(records) == 1:
+            subject = f"New enquiry: {records[0]['subject'] or records[0]['name']}"
+        else:
+            subject = f'{len(records)} new enquiries'
+        body = '\n\n'.join(
+            f"From: {r['name']} <{r['email']}>\nSubject: {r['subject']}\nReceived: {r['date']}\n\n{r['message']}"
+            for r in records)
+        send_mail(to, subject, body, reply_to=records[0]['email'] if len(records) == 1 else None)
+    except Exception:
+        app.logger.exception('Could not queue the enquiry notification email')
+
+
+def _recover_spool(state):
+    """Replay spool files left by dead processes and this process's failed segments."""
+    with state.recover_lock:
+        _replay_orphans(state)
+
+
+def _replay_orphans(state):
+    for path in glob.glob(os.path.join(state.spool_dir, 'enquiries-*')):
+        name = os.path.basename(path)
+        if '.claimed-' in name:
+            owner = int(name.rsplit('.claimed-', 1)[1])
+        else:
+            owner = int(name.split('-')[1].split('.')[0])
+            if path == state.spool_path:
+                continue  # our live spool
+            with state.lock:
+                if path in state.in_flight:
+                    continue  # being inserted by _flush_once right now
+        if owner != state.pid and _pid_alive(owner):
+            continue
+        # Renaming claims the file; if another worker got there first we skip it
+        claimed = path if name.endswith(f'.claimed-{state.pid}') else f'{path}.claimed-{state.pid}'
+        try:
+            if claimed != path:
+                os.rename(path, claimed)
+        except FileNotFoundError:
+            continue
+        records = []
+        with open(claimed) as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # A crash mid-write leaves a truncated last line; keep the rest
+                    state.app.logger.warning('Skipping unreadable line %d of enquiry spool %s', number, claimed)
+        if records:
+            _insert(state.app, records)
+        os.remove(claimed)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+enquiry_queue = EnquiryQueue()
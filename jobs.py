@@ -0,0 +1,340 @@
+"""Durable background jobs for side effects that should not hold up a request.
+
+Jobs live in a SQLite file of their own (JOBS_DB, WAL), so enqueueing is one
+INSERT that every gunicorn worker can make without touching the main
+database. A separate worker process claims due jobs under a lease, runs
+their handlers in a thread or process pool and records the outcome:
+
+    python -m jobs worker [--threads 4] [--processes 2] [--kind send_email] [--drain]
+    python -m jobs status
+
+A failing job is retried with exponential backoff until it runs out of
+attempts. A worker that dies mid-job stops renewing its leases, and the job
+is picked up again once they expire, so handlers must tolerate running more
+than once. Each kind caps how many of its jobs run at once across all
+workers.
+
+Handlers register next to the code they serve with ``@task(kind, ...)``.
+Thread handlers run inside an app context; process handlers get only their
+payload and must be module-level functions.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from flask import current_app
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY,
+        kind TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        state TEXT NOT NULL DEFAULT 'queued',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        max_attempts INTEGER NOT NULL,
+        run_at REAL NOT NULL,
+        lease_until REAL,
+        worker TEXT,
+        last_error TEXT,
+        created REAL NOT NULL,
+        finished REAL
+    );
+    CREATE INDEX IF NOT EXISTS ix_jobs_state_kind_run_at ON jobs (state, kind, run_at);
+'''
+ENQUEUE_SQL = '''
+    INSERT INTO jobs (kind, payload, max_attempts, run_at, created)
+    SELECT :kind, :payload, :max_attempts, :run_at, :now
+    WHERE NOT :unique OR NOT EXISTS (
+        SELECT 1 FROM jobs WHERE state = 'queued' AND kind = :kind AND payload = :payload)
+    RETURNING id
+'''
+# One statement, so the pick and the per-kind running count are atomic across workers
+CLAIM_SQL = '''
+    UPDATE jobs SET state = 'running', attempts = attempts + 1, lease_until = :lease_until, worker = :worker
+    WHERE id = (SELECT id FROM jobs WHERE state = 'queued' AND kind = :kind AND run_at <= :now
+                ORDER BY run_at, id LIMIT 1)
+      AND (SELECT COUNT(*) FROM jobs WHERE state = 'running' AND kind = :kind) < :concurrency
+    RETURNING id, payload, attempts, max_attempts
+'''
+EXPIRE_SQL = '''
+    UPDATE jobs SET state = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,
+                    run_at = :now, lease_until = NULL, worker = NULL,
+                    finished = CASE WHEN attempts >= max_attempts THEN :now END,
+                    last_error = 'lease expired'
+    WHERE state = 'running' AND lease_until < :now
+'''
+STATES = ('queued', 'running', 'done', 'failed')
+
+TASKS = {}
+
+
+class Task:
+    def __init__(self, kind, func, concurrency, max_attempts, backoff, lease, pool):
+        self.kind = kind
+        self.func = func
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.lease = lease
+        self.pool = pool
+
+    def retry_delay(self, attempts, cap):
+        # Full jitter keeps retries of a burst of failures from lining up
+        return random.uniform(0.5, 1.0) * min(cap, self.backoff * 2 ** (attempts - 1))
+
+
+def task(kind, concurrency=1, max_attempts=5, backoff=30, lease=300, pool='thread'):
+    """Register a handler for jobs of this kind. pool is 'thread' or 'process'."""
+    if pool not in ('thread', 'process'):
+        raise ValueError(f'Unknown pool: {pool}')
+
+    def register(func):
+        TASKS[kind] = Task(kind, func, concurrency, max_attempts, backoff, lease, pool)
+        return func
+    return register
+
+
+class _JobsState:
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        os.register_at_fork(after_in_child=self.reset)
+
+    def reset(self):
+        self.local = threading.local()
+
+    def connection(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None, timeout=10)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(SCHEMA)
+            self.local.conn = conn
+        return conn
+
+    def execute(self, sql, params=()):
+        return self.connection().execute(sql, params)
+
+    def enqueue(self, kind, payload, delay, max_attempts, unique):
+        now = time.time()
+        row = self.execute(ENQUEUE_SQL, {
+            'kind': kind, 'payload': json.dumps(payload, sort_keys=True), 'max_attempts': max_attempts,
+            'run_at': now + delay, 'now': now, 'unique': unique}).fetchone()
+        return row[0] if row else None
+
+    def claim(self, task, worker):
+        now = time.time()
+        row = self.execute(CLAIM_SQL, {
+            'kind': task.kind, 'now': now, 'lease_until': now + task.lease,
+            'worker': worker, 'concurrency': task.concurrency}).fetchone()
+        if row is None:
+            return None
+        return {'id': row[0], 'payload': json.loads(row[1]), 'attempts': row[2], 'max_attempts': row[3]}
+
+    def complete(self, job_id, worker):
+        # A job whose lease lapsed may have been claimed again; leave it to its new owner
+        self.execute("UPDATE jobs SET state = 'done', finished = ?, lease_until = NULL, last_error = NULL "
+                     "WHERE id = ? AND worker = ? AND state = 'running'", (time.time(), job_id, worker))
+
+    def fail(self, job, worker, error, delay):
+        now = time.time()
+        if job['attempts'] >= job['max_attempts']:
+            self.execute("UPDATE jobs SET state = 'failed', finished = ?, lease_until = NULL, last_error = ? "
+                         "WHERE id = ? AND worker = ? AND state = 'running'", (now, error, job['id'], worker))
+        else:
+            self.execute("UPDATE jobs SET state = 'queued', run_at = ?, lease_until = NULL, worker = NULL, "
+                         "last_error = ? WHERE id = ? AND worker = ? AND state = 'running'",
+                         (now + delay, error, job['id'], worker))
+
+    def renew(self, task, worker):
+        self.execute("UPDATE jobs SET lease_until = ? WHERE state = 'running' AND kind = ? AND worker = ?",
+                     (time.time() + task.lease, task.kind, worker))
+
+    def expire_leases(self):
+        return self.execute(EXPIRE_SQL, {'now': time.time()}).rowcount
+
+    def prune(self, days):
+        return self.execute("DELETE FROM jobs WHERE state = 'done' AND finished < ?",
+                            (time.time() - days * 86400,)).rowcount
+
+    def counts(self):
+        counts = {}
+        for kind, state, count in self.execute('SELECT kind, state, COUNT(*) FROM jobs GROUP BY kind, state'):
+            counts.setdefault(kind, dict.fromkeys(STATES, 0))[state] = count
+        return counts
+
+
+class JobQueue:
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        os.makedirs(app.instance_path, exist_ok=True)
+        path = app.config.setdefault('JOBS_DB', os.path.join(app.instance_path, 'jobs.db'))
+        app.config.setdefault('JOBS_THREADS', 4)
+        app.config.setdefault('JOBS_PROCESSES', None)  # default: one per CPU
+        app.config.setdefault('JOBS_POLL_INTERVAL', 1.0)
+        app.config.setdefault('JOBS_HEARTBEAT', 30)
+        app.config.setdefault('JOBS_BACKOFF_MAX', 3600)
+        app.config.setdefault('JOBS_KEEP_DAYS', 7)
+        app.extensions['jobs'] = _JobsState(path)
+
+    @property
+    def _state(self):
+        return current_app.extensions['jobs']
+
+    def enqueue(self, kind, payload=None, delay=0, max_attempts=None, unique=False):
+        """Queue a job to run after delay seconds. Returns its id.
+
+        With unique=True nothing is queued while an identical job is still
+        waiting, and None is returned.
+        """
+        if kind not in TASKS:
+            raise ValueError(f'Unknown job kind: {kind}')
+        return self._state.enqueue(kind, payload or {}, delay, max_attempts or TASKS[kind].max_attempts, unique)
+
+    def counts(self):
+        """{kind: {state: count}} for every kind with jobs on record."""
+        return self._state.counts()
+
+
+job_queue = JobQueue()
+
+
+# --- Worker ---
+
+def _run_in_app(app, func, payload):
+    with app.app_context():
+        return func(payload)
+
+
+class Worker:
+    def __init__(self, app, kinds=None, threads=None, processes=None):
+        self.app = app
+        self.state = app.extensions['jobs']
+        self.tasks = [TASKS[kind] for kind in (kinds or sorted(TASKS))]
+        self.name = f'{socket.gethostname()}:{os.getpid()}'
+        self.threads = threads or app.config['JOBS_THREADS']
+        self.processes = processes or app.config['JOBS_PROCESSES'] or os.cpu_count()
+        self.thread_pool = ThreadPoolExecutor(self.threads, thread_name_prefix='job')
+        self.process_pool = None
+        if any(t.pool == 'process' for t in self.tasks):
+            self.process_pool = ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context('spawn'))
+        self.running = {}  # future -> (task, job)
+        self.stopping = False
+
+    def stop(self, *args):
+        self.stopping = True
+
+    def _capacity(self, task):
+        pool_size = self.threads if task.pool == 'thread' else self.processes
+        in_pool = sum(1 for t, _ in self.running.values() if t.pool == task.pool)
+        return pool_size - in_pool
+
+    def _claim(self):
+        claimed = 0
+        for task in self.tasks:
+            while self._capacity(task) > 0:
+                job = self.state.claim(task, self.name)
+                if job is None:
+                    break
+                if task.pool == 'thread':
+                    future = self.thread_pool.submit(_run_in_app, self.app, task.func, job['payload'])
+                else:
+                    future = self.process_pool.submit(task.func, job['payload'])
+                self.running[future] = (task, job)
+                claimed += 1
+        return claimed
+
+    def _finish(self, futures):
+        for future in futures:
+            task, job = self.running.pop(future)
+            error = future.exception()
+            if error is None:
+                self.state.complete(job['id'], self.name)
+                continue
+            message = ''.join(traceback.format_exception_only(type(error), error)).strip()
+            delay = task.retry_delay(job['attempts'], self.app.config['JOBS_BACKOFF_MAX'])
+            self.state.fail(job, self.name, message, delay)
+            final = job['attempts'] >= job['max_attempts']
+            print(f"JOB {'FAILED' if final else 'ERROR'}: {task.kind} #{job['id']} "
+                  f"attempt {job['attempts']}/{job['max_attempts']}: {message}"
+                  + ('' if final else f'; retrying in {delay:.0f}s'))
+
+    def _housekeeping(self):
+        for task in self.tasks:
+            if any(t is task for t, _ in self.running.values()):
+                self.state.renew(task, self.name)
+        expired = self.state.expire_leases()
+        if expired:
+            print(f"JOB WARNING: requeued {expired} jobs whose worker stopped renewing its lease")
+        self.state.prune(self.app.config['JOBS_KEEP_DAYS'])
+
+    def run(self, drain=False):
+        """Process jobs until stopped. With drain, return once nothing is due or running."""
+        poll = self.app.config['JOBS_POLL_INTERVAL']
+        heartbeat = self.app.config['JOBS_HEARTBEAT']
+        next_housekeeping = 0
+        try:
+            while True:
+                if time.monotonic() >= next_housekeeping:
+                    self._housekeeping()
+                    next_housekeeping = time.monotonic() + heartbeat
+                claimed = 0 if self.stopping else self._claim()
+                if not self.running:
+                    if self.stopping or (drain and not claimed):
+                        return
+                    time.sleep(poll)
+                    continue
+                done, _ = wait(list(self.running), timeout=poll, return_when=FIRST_COMPLETED)
+                self._finish(done)
+        finally:
+            self.thread_pool.shutdown()
+            if self.process_pool is not None:
+                self.process_pool.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run or inspect background jobs.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    worker = commands.add_parser('worker', help='claim and run jobs until stopped')
+    worker.add_argument('--threads', type=int, help='thread pool size (JOBS_THREADS)')
+    worker.add_argument('--processes', type=int, help='process pool size (JOBS_PROCESSES)')
+    worker.add_argument('--kind', action='append', help='only run these kinds (repeatable)')
+    worker.add_argument('--drain', action='store_true', help='exit once no job is due')
+    commands.add_parser('status', help='job counts by kind and state')
+    args = parser.parse_args(argv)
+
+    from app import create_app
+
+    app = create_app()
+    if args.command == 'status':
+        with app.app_context():
+            for kind, counts in sorted(job_queue.counts().items()):
+                print(f'{kind:20} ' + '  '.join(f'{state}={counts[state]}' for state in STATES))
+        return
+    unknown = set(args.kind or ()) - set(TASKS)
+    if unknown:
+        parser.error(f"unknown kind(s): {', '.join(sorted(unknown))}; known: {', '.join(sorted(TASKS))}")
+    runner = Worker(app, args.kind, args.threads, args.processes)
+    signal.signal(signal.SIGTERM, runner.stop)
+    signal.signal(signal.SIGINT, runner.stop)
+    print(f"Worker {runner.name} running {', '.join(t.kind for t in runner.tasks)}")
+    runner.run(drain=args.drain)
+
+
+if __name__ == '__main__':
+    # Run from the importable module: handlers register on jobs.TASKS, not __main__'s copy
+    import jobs
+    jobs.main()
@@ -0,0 +1,135 @@
+"""Outgoing email, sent by the job worker rather than inside a request.
+
+send_mail() queues a ``send_email`` job; the worker delivers it over SMTP
+to MAIL_SERVER:MAIL_PORT and retries with backoff while the server is
+unreachable. For development the default points at a local stand-in that
+accepts everything and writes each message to a .eml file:
+
+    python -m mailer --port 1025 --dir instance/mail
+"""
+import argparse
+import os
+import smtplib
+import socketserver
+import time
+from email.message import EmailMessage
+
+from flask import current_app
+
+from jobs import job_queue, task
+
+
+def init_app(app):
+    app.config.setdefault('MAIL_SERVER', os.environ.get('MAIL_SERVER', 'localhost'))
+    app.config.setdefault('MAIL_PORT', int(os.environ.get('MAIL_PORT', 1025)))
+    app.config.setdefault('MAIL_USERNAME', os.environ.get('MAIL_USERNAME'))
+    app.config.setdefault('MAIL_PASSWORD', os.environ.get('MAIL_PASSWORD'))
+    app.config.setdefault('MAIL_USE_TLS', False)
+    app.config.setdefault('MAIL_TIMEOUT', 10)
+    app.config.setdefault('MAIL_SENDER', 'noreply@localhost')
+
+
+def send_mail(to, subject, body, reply_to=None):
+    """Queue a plain-text email. Returns the job id."""
+    return job_queue.enqueue('send_email', {'to': to, 'subject': subject, 'body': body, 'reply_to': reply_to})
+
+
+@task('send_email', concurrency=2, max_attempts=8, backoff=60, lease=120)
+def send_email(payload):
+    config = current_app.config
+    message = EmailMessage()
+    message['From'] = config['MAIL_SENDER']
+    message['To'] = payload['to']
+    message['Subject'] = payload['subject']
+    if payload.get('reply_to'):
+        message['Reply-To'] = payload['reply_to']
+    message.set_content(payload['body'])
+    with smtplib.SMTP(config['MAIL_SERVER'], config['MAIL_PORT'], timeout=config['MAIL_TIMEOUT']) as smtp:
+        if config['MAIL_USE_TLS']:
+            smtp.starttls()
+        if config['MAIL_USERNAME']:
+            smtp.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
+        smtp.send_message(message)
+
+
+# --- Local SMTP stand-in ---
+
+class _SinkHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib: accepts every message and writes it to disk."""
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        self.reply('220 localhost mail sink')
+        recipients = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('utf-8', 'replace').strip().split(' ', 1)[0].upper()
+            if command in ('EHLO', 'HELO'):
+                self.reply('250 localhost')
+            elif command == 'MAIL':
+                recipients = []
+                self.reply('250 OK')
+            elif command == 'RCPT':
+                recipients.append(line.decode('utf-8', 'replace').split(':', 1)[-1].strip())
+                self.reply('250 OK')
+            elif command == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                self.save(self.read_data(), recipients)
+                self.reply('250 OK')
+            elif command in ('RSET', 'NOOP'):
+                self.reply('250 OK')
+            elif command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+    def read_data(self):
+        lines = []
+        while True:
+            line = self.rfile.readline()
+            if not line or line.rstrip(b'\r\n') == b'.':
+                return b''.join(lines)
+            # Undo dot-stuffing
+            lines.append(line[1:] if line.startswith(b'..') else line)
+
+    def save(self, data, recipients):
+        server = self.server
+        server.count += 1
+        path = os.path.join(server.directory, f'{time.time_ns()}-{server.count}.eml')
+        with open(path, 'wb') as f:
+            f.write(data)
+        print(f"MAIL to {', '.join(recipients)} -> {path}")
+
+
+class MailSink(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address, directory):
+        super().__init__(address, _SinkHandler)
+        self.directory = directory
+        self.count = 0
+        os.makedirs(directory, exist_ok=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Local SMTP stand-in that writes messages to .eml files.')
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=1025)
+    parser.add_argument('--dir', default=os.path.join('instance', 'mail'))
+    args = parser.parse_args(argv)
+    with MailSink((args.host, args.port), args.dir) as server:
+        print(f'Mail sink on {args.host}:{args.port}, writing to {args.dir}')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
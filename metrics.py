@@ -0,0 +1,218 @@
+"""Per-request timing, SQL instrumentation and Prometheus text exposition.
+
+Every request records its latency per endpoint, and how much of it went to
+SQLite (cursor execute hooks) and Jinja (render signals). The split is sent
+back as a ``Server-Timing`` header for browser devtools and aggregated into
+histograms served at ``/admin/metrics``. Statements slower than
+``SLOW_QUERY_MS`` are printed with their endpoint.
+
+Metrics live in process memory, so each gunicorn worker reports its own
+counters; scrape every worker or sum them per instance.
+"""
+import bisect
+import os
+import threading
+import time
+
+from flask import before_render_template, current_app, g, has_request_context, request, template_rendered
+from sqlalchemy import event
+
+from models import db
+
+# Seconds; the default Prometheus client buckets, plus 1 ms for SQLite
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self):
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{bound:g}', cumulative
+        yield '+Inf', self.count
+
+
+class Registry:
+    """Counters and histograms keyed by (name, label tuple)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.families = {}
+
+    def _family(self, name, kind, help_text):
+        family = self.families.get(name)
+        if family is None:
+            family = self.families[name] = (kind, help_text, {})
+        return family[2]
+
+    def inc(self, name, help_text, labels=(), value=1):
+        with self.lock:
+            series = self._family(name, 'counter', help_text)
+            series[labels] = series.get(labels, 0) + value
+
+    def observe(self, name, help_text, labels, value):
+        with self.lock:
+            series = self._family(name, 'histogram', help_text)
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = Histogram()
+            histogram.observe(value)
+
+    def render(self):
+        lines = []
+        with self.lock:
+            for name, (kind, help_text, series) in sorted(self.families.items()):
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, value in sorted(series.items()):
+                    if kind == 'counter':
+                        lines.append(f'{name}{_labels(labels)} {value:g}')
+                        continue
+                    for bound, count in value.samples():
+                        lines.append(f'{name}_bucket{_labels(labels + (("le", bound),))} {count}')
+                    lines.append(f'{name}_sum{_labels(labels)} {value.sum:g}')
+                    lines.append(f'{name}_count{_labels(labels)} {value.count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for _, value in labels)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + '}'
+
+
+class Metrics:
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('METRICS_ENABLED', True)
+        app.config.setdefault('METRICS_TOKEN', os.environ.get('METRICS_TOKEN'))  # lets a scraper skip the login
+        app.config.setdefault('SLOW_QUERY_MS', 200)  # 0 or None turns the slow-query log off
+        app.config.setdefault('SERVER_TIMING', True)
+        registry = app.extensions['metrics'] = Registry()
+        if not app.config['METRICS_ENABLED']:
+            return
+
+        with app.app_context():
+            engine = db.engine
+        slow_ms = app.config['SLOW_QUERY_MS']
+        _install_sql_hooks(engine, registry, slow_ms / 1000 if slow_ms else None)
+        before_render_template.connect(_template_started, app, weak=False)
+        template_rendered.connect(_template_finished, app, weak=False)
+        app.before_request(_request_started)
+        app.after_request(lambda response: _request_finished(app, registry, response))
+        app.teardown_request(lambda exc: _request_failed(registry, exc))
+
+    def render(self):
+        return current_app.extensions['metrics'].render()
+
+
+metrics = Metrics()
+
+
+# --- Request timing ---
+def _request_started():
+    g.metrics = {'start': time.perf_counter(), 'db': 0.0, 'queries': 0, 'tpl': 0.0, 'recorded': False}
+
+
+def _endpoint():
+    # Unmatched URLs share one label so 404 scans can't explode cardinality
+    return request.endpoint or 'unmatched'
+
+
+def _record(registry, timing, status):
+    timing['recorded'] = True
+    total = time.perf_counter() - timing['start']
+    endpoint = _endpoint()
+    registry.inc('http_requests_total', 'Requests handled.',
+                 (('endpoint', endpoint), ('method', request.method), ('status', str(status))))
+    registry.observe('http_request_duration_seconds', 'Time from routing to response, by endpoint.',
+                     (('endpoint', endpoint),), total)
+    registry.observe('db_time_per_request_seconds', 'Time spent in SQLite per request, by endpoint.',
+                     (('endpoint', endpoint),), timing['db'])
+    registry.inc('db_queries_total', 'SQL statements executed, by endpoint.',
+                 (('endpoint', endpoint),), timing['queries'])
+    if timing['tpl']:
+        registry.observe('template_render_seconds', 'Time spent rendering Jinja templates, by endpoint.',
+                         (('endpoint', endpoint),), timing['tpl'])
+    return total
+
+
+def _request_finished(app, registry, response):
+    timing = g.get('metrics')
+    if timing is None or timing['recorded']:
+        return response
+    total = _record(registry, timing, response.status_code)
+    if app.config['SERVER_TIMING']:
+        handler = max(total - timing['db'] - timing['tpl'], 0.0)
+        response.headers.add('Server-Timing', ', '.join((
+            f'db;dur={timing["db"] * 1000:.2f};desc="SQLite ({timing["queries"]} queries)"',
+            f'tpl;dur={timing["tpl"] * 1000:.2f};desc="Jinja"',
+            f'handler;dur={handler * 1000:.2f};desc="Handler"',
+            f'total;dur={total * 1000:.2f}',
+        )))
+    return response
+
+
+def _request_failed(registry, exc):
+    # after_request doesn't run when a view raises; count those as 500s here
+    timing = g.get('metrics')
+    if timing is not None and not timing['recorded']:
+        _record(registry, timing, 500)
+
+
+# --- Template timing ---
+def _template_started(app, template, context, **extra):
+    if 'metrics' in g:
+        g.metrics['tpl_start'] = time.perf_counter()
+
+
+def _template_finished(app, template, context, **extra):
+    timing = g.get('metrics')
+    if timing is not None and 'tpl_start' in timing:
+        timing['tpl'] += time.perf_counter() - timing.pop('tpl_start')
+
+
+# --- SQL timing ---
+def _install_sql_hooks(engine, registry, slow_seconds):
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_start'].pop()
+        registry.observe('db_query_duration_seconds', 'Duration of individual SQL statements.', (), elapsed)
+        endpoint = None
+        if has_request_context() and 'metrics' in g:
+            g.metrics['db'] += elapsed
+            g.metrics['queries'] += 1
+            endpoint = _endpoint()
+        if slow_seconds is not None and elapsed >= slow_seconds:
+            registry.inc('db_slow_queries_total', 'SQL statements slower than SLOW_QUERY_MS.')
+            print(f'SLOW QUERY {elapsed * 1000:.1f}ms [{endpoint or "-"}]: {" ".join(statement.split())[:500]}')
+
+    @event.listens_for(engine, 'handle_error')
+    def handle_error(context):
+        # A failed execute never reaches after_cursor_execute
+        starts = context.connection.info.get('query_start') if context.connection is not None else None
+        if starts:
+            starts.pop()
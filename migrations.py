@@ -0,0 +1,454 @@
+"""Versioned schema migrations for the SQLite database.
+
+Each step runs in its own transaction and is recorded in ``schema_version``,
+so a failed step rolls back completely and the next run resumes from it.
+Steps are written against a Migrator, which executes the change or, in
+dry-run mode, only counts the rows it would touch.
+
+    python migrations.py [--db database.db] [--dry-run] [--status]
+    flask --app app migrate [--dry-run]
+"""
+import argparse
+import sqlite3
+import time
+from datetime import datetime
+
+from dates import parse_date, parse_datetime
+
+DATABASE = 'database.db'
+CHUNK_SIZE = 5000
+
+MIGRATIONS = []
+
+
+class Migration:
+    def __init__(self, version, description, apply):
+        self.version = version
+        self.description = description
+        self.apply = apply
+
+
+def migration(version, description):
+    def register(fn):
+        MIGRATIONS.append(Migration(version, description, fn))
+        MIGRATIONS.sort(key=lambda m: m.version)
+        return fn
+    return register
+
+
+class Migrator:
+    """Schema helpers handed to each migration step."""
+
+    def __init__(self, conn, dry_run=False, chunk_size=CHUNK_SIZE, log=print):
+        self.conn = conn
+        self.dry_run = dry_run
+        self.chunk_size = chunk_size
+        self.log = log
+        self.rows = 0
+
+    def has_table(self, table):
+        return self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type IN ('table', 'view') AND name = ?", (table,)).fetchone() is not None
+
+    def columns(self, table):
+        return [row[1] for row in self.conn.execute(f'PRAGMA table_info("{table}")')]
+
+    def count(self, table, where='1'):
+        try:
+            return self.conn.execute(f'SELECT COUNT(*) FROM "{table}" WHERE {where}').fetchone()[0]
+        except sqlite3.OperationalError:
+            # In a dry run an earlier step may not have added the column yet
+            if not self.dry_run:
+                raise
+            return 0
+
+    def execute(self, sql, params=()):
+        if not self.dry_run:
+            self.conn.execute(sql, params)
+
+    def add_column(self, table, column, ddl):
+        # SQLite adds columns in place without rewriting rows
+        if self.has_table(table) and column not in self.columns(table):
+            self.execute(f'ALTER TABLE "{table}" ADD COLUMN {ddl}')
+
+    def create_index(self, name, table, columns):
+        if not self.has_table(table):
+            return
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (name,)).fetchone()
+        if not exists:
+            self.rows += self.count(table)
+            self.execute(f'CREATE INDEX "{name}" ON "{table}" ({columns})')
+
+    def update_chunked(self, table, assignments, where):
+        """Run UPDATE ... WHERE in rowid-ordered chunks of chunk_size rows."""
+        if not self.has_table(table):
+            return
+        if self.dry_run:
+            self.rows += self.count(table, where)
+            return
+        last = 0
+        while True:
+            rowids = [row[0] for row in self.conn.execute(
+                f'SELECT rowid FROM "{table}" WHERE rowid > ? AND ({where}) ORDER BY rowid LIMIT ?',
+                (last, self.chunk_size))]
+            if not rowids:
+                break
+            last = rowids[-1]
+            self.conn.execute(
+                f'UPDATE "{table}" SET {assignments} WHERE rowid BETWEEN ? AND ? AND ({where})',
+                (rowids[0], last))
+            self.rows += len(rowids)
+
+    def rebuild_table(self, table, create_sql, columns, select=None, transform=None):
+        """Recreate a table and stream its rows across in chunks.
+
+        create_sql is a CREATE TABLE statement with a ``{table}`` placeholder
+        for the name. columns lists the target columns, select the matching
+        SQL expressions read from the old table (defaults to the same names),
+        and transform optionally rewrites each row tuple in Python. Indexes
+        and triggers of the old table are recreated afterwards.
+        """
+        if self.dry_run:
+            self.rows += self.count(table)
+            return
+        saved = [row[0] for row in self.conn.execute(
+            "SELECT sql FROM sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger') "
+            "AND sql IS NOT NULL ORDER BY type", (table,))]
+        new_table = f'{table}__rebuild'
+        self.conn.execute(f'DROP TABLE IF EXISTS "{new_table}"')
+        self.conn.execute(create_sql.format(table=f'"{new_table}"'))
+
+        select_sql = ', '.join(select or [f'"{column}"' for column in columns])
+        column_sql = ', '.join(f'"{column}"' for column in columns)
+        insert_sql = f'INSERT INTO "{new_table}" ({column_sql}) VALUES ({", ".join("?" for _ in columns)})'
+        last = 0
+        while True:
+            rows = self.conn.execute(
+                f'SELECT rowid, {select_sql} FROM "{table}" WHERE rowid > ? ORDER BY rowid LIMIT ?',
+                (last, self.chunk_size)).fetchall()
+            if not rows:
+                break
+            last = rows[-1][0]
+            batch = [row[1:] for row in rows]
+            if transform:
+                batch = [transform(row) for row in batch]
+            self.conn.executemany(insert_sql, batch)
+            self.rows += len(rows)
+
+        self.conn.execute(f'DROP TABLE "{table}"')
+        self.conn.execute(f'ALTER TABLE "{new_table}" RENAME TO "{table}"')
+        for sql in saved:
+            self.conn.execute(sql)
+
+
+# --- Migration steps ---
+@migration(1, 'Add columns missing from early services/works schemas')
+def add_missing_columns(m):
+    m.add_column('services', 'image', 'image VARCHAR(255)')
+    m.add_column('services', 'full_desc', 'full_desc TEXT')
+    m.add_column('services', 'status', 'status VARCHAR(20)')
+    m.add_column('services', 'order', '"order" INTEGER DEFAULT 0')
+    m.add_column('works', 'image', 'image VARCHAR(255)')
+    m.add_column('works', 'date', 'date VARCHAR(20)')
+    m.add_column('works', 'description', 'description TEXT')
+    m.add_column('works', 'status', 'status VARCHAR(20)')
+    m.add_column('works', 'created_at', 'created_at VARCHAR(50)')
+
+
+@migration(2, 'Normalize services/works status values to upper case')
+def normalize_status(m):
+    for table in ('services', 'works'):
+        m.update_chunked(table, 'status = UPPER(status)', 'status <> UPPER(status)')
+
+
+@migration(3, 'Composite indexes for the paginated listing APIs')
+def listing_indexes(m):
+    m.create_index('ix_services_status_order', 'services', 'status, "order"')
+    m.create_index('ix_works_status_id', 'works', 'status, id')
+
+
+@migration(4, 'Bookings table with a start/end date index')
+def create_bookings(m):
+    m.execute('''
+        CREATE TABLE IF NOT EXISTS bookings (
+            id INTEGER NOT NULL PRIMARY KEY,
+            client_name VARCHAR(100) NOT NULL,
+            email VARCHAR(120) NOT NULL,
+            phone VARCHAR(30),
+            event_type VARCHAR(100),
+            start_date DATE NOT NULL,
+            end_date DATE NOT NULL,
+            location VARCHAR(200),
+            details TEXT,
+            status VARCHAR(20),
+            created_at DATETIME
+        )''')
+    m.execute('CREATE INDEX IF NOT EXISTS ix_bookings_start_end ON bookings (start_date, end_date)')
+
+
+def create_fts(m, table, columns):
+    """External-content FTS5 index on table, kept in sync by triggers."""
+    if not m.has_table(table):
+        return
+    fts = f'{table}_fts'
+    column_sql = ', '.join(columns)
+    new_sql = ', '.join(f'new.{column}' for column in columns)
+    old_sql = ', '.join(f'old.{column}' for column in columns)
+    m.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+              f"{column_sql}, content='{table}', content_rowid='id', "
+              f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')")
+    m.execute(f'CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN '
+              f'INSERT INTO {fts} (rowid, {column_sql}) VALUES (new.id, {new_sql}); END')
+    m.execute(f'CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN '
+              f"INSERT INTO {fts} ({fts}, rowid, {column_sql}) VALUES ('delete', old.id, {old_sql}); END")
+    m.execute(f'CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {column_sql} ON {table} BEGIN '
+              f"INSERT INTO {fts} ({fts}, rowid, {column_sql}) VALUES ('delete', old.id, {old_sql}); "
+              f'INSERT INTO {fts} (rowid, {column_sql}) VALUES (new.id, {new_sql}); END')
+    m.rows += m.count(table)
+    m.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+
+
+@migration(5, 'FTS5 search indexes for works, services and enquiries')
+def search_indexes(m):
+    create_fts(m, 'works', ['title', 'description', 'location', 'category'])
+    create_fts(m, 'services', ['title', 'short_desc', 'full_desc'])
+    create_fts(m, 'enquiry', ['name', 'email', 'subject', 'message'])
+
+
+SYNC_NOW = "strftime('%Y-%m-%dT%H:%M:%fZ', 'now')"
+
+
+def track_changes(m, table, offset):
+    """Stamp rows of table with updated_at/sync_seq and log deletes. Returns the new offset."""
+    if not m.has_table(table):
+        return offset
+    m.add_column(table, 'updated_at', 'updated_at VARCHAR(30)')
+    m.add_column(table, 'sync_seq', 'sync_seq INTEGER')
+    # Existing rows get distinct sequence numbers above everything handed out so far
+    highest = m.conn.execute(f'SELECT COALESCE(MAX(rowid), 0) FROM "{table}"').fetchone()[0]
+    m.update_chunked(table, f'sync_seq = rowid + {offset}, updated_at = {SYNC_NOW}', 'sync_seq IS NULL')
+    m.create_index(f'ix_{table}_sync_seq', table, 'sync_seq')
+    stamp = (f'UPDATE sync_clock SET seq = seq + 1 WHERE id = 1; '
+             f'UPDATE "{table}" SET sync_seq = (SELECT seq FROM sync_clock WHERE id = 1), '
+             f'updated_at = {SYNC_NOW} WHERE rowid = NEW.rowid;')
+    m.execute(f'CREATE TRIGGER IF NOT EXISTS {table}_sync_ai AFTER INSERT ON "{table}" BEGIN {stamp} END')
+    # The guard skips the trigger's own UPDATE should recursive triggers ever be enabled
+    m.execute(f'CREATE TRIGGER IF NOT EXISTS {table}_sync_au AFTER UPDATE ON "{table}" '
+              f'WHEN NEW.sync_seq IS OLD.sync_seq BEGIN {stamp} END')
+    m.execute(f'CREATE TRIGGER IF NOT EXISTS {table}_sync_ad AFTER DELETE ON "{table}" BEGIN '
+              f'UPDATE sync_clock SET seq = seq + 1 WHERE id = 1; '
+              f'INSERT INTO sync_tombstones (seq, table_name, row_id, deleted_at) '
+              f"VALUES ((SELECT seq FROM sync_clock WHERE id = 1), '{table}', OLD.id, {SYNC_NOW}); END")
+    return offset + highest
+
+
+@migration(6, 'Change tracking and delete tombstones for the admin delta sync')
+def sync_tracking(m):
+    m.execute('''
+        CREATE TABLE IF NOT EXISTS sync_clock (
+            id INTEGER NOT NULL PRIMARY KEY CHECK (id = 1),
+            seq INTEGER NOT NULL,
+            pruned_seq INTEGER NOT NULL DEFAULT 0
+        )''')
+    m.execute('INSERT OR IGNORE INTO sync_clock (id, seq, pruned_seq) VALUES (1, 0, 0)')
+    m.execute('''
+        CREATE TABLE IF NOT EXISTS sync_tombstones (
+            seq INTEGER NOT NULL PRIMARY KEY,
+            table_name VARCHAR(50) NOT NULL,
+            row_id INTEGER NOT NULL,
+            deleted_at VARCHAR(30) NOT NULL
+        )''')
+    m.execute('CREATE INDEX IF NOT EXISTS ix_sync_tombstones_table_seq ON sync_tombstones (table_name, seq)')
+    offset = 0
+    if m.has_table('sync_clock'):
+        offset = m.conn.execute('SELECT seq FROM sync_clock WHERE id = 1').fetchone()[0]
+    for table in ('services', 'works', 'enquiry'):
+        offset = track_changes(m, table, offset)
+    m.execute('UPDATE sync_clock SET seq = ? WHERE id = 1', (offset,))
+
+
+FACET_COLUMNS = ('category', 'location')
+
+
+def facet_delta(row, sign):
+    """Trigger SQL adding sign to the facet counts of a VISIBLE row (NEW or OLD)."""
+    statements = []
+    for column in FACET_COLUMNS:
+        value = f'{row}.{column}'
+        if sign > 0:
+            statements.append(
+                f"INSERT INTO work_facets (facet, value, count) SELECT '{column}', {value}, 1 "
+                f"WHERE {row}.status = 'VISIBLE' AND COALESCE({value}, '') <> '' "
+                f'ON CONFLICT (facet, value) DO UPDATE SET count = count + 1;')
+        else:
+            statements.append(
+                f"UPDATE work_facets SET count = count - 1 WHERE facet = '{column}' AND value = {value} "
+                f"AND {row}.status = 'VISIBLE';")
+            statements.append(f"DELETE FROM work_facets WHERE facet = '{column}' AND value = {value} AND count <= 0;")
+    return ' '.join(statements)
+
+
+@migration(7, 'Work facet counts and category/location listing indexes')
+def work_facets(m):
+    m.execute('''
+        CREATE TABLE IF NOT EXISTS work_facets (
+            facet VARCHAR(20) NOT NULL,
+            value VARCHAR(100) NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (facet, value)
+        ) WITHOUT ROWID''')
+    if not m.has_table('works'):
+        return
+    m.create_index('ix_works_status_category_id', 'works', 'status, category, id')
+    m.create_index('ix_works_status_location_id', 'works', 'status, location, id')
+    # Only visible works are counted, matching what the public gallery lists
+    m.execute(f'CREATE TRIGGER IF NOT EXISTS works_facets_ai AFTER INSERT ON works BEGIN '
+              f"{facet_delta('NEW', 1)} END")
+    m.execute(f'CREATE TRIGGER IF NOT EXISTS works_facets_ad AFTER DELETE ON works BEGIN '
+              f"{facet_delta('OLD', -1)} END")
+    m.execute(f'CREATE TRIGGER IF NOT EXISTS works_facets_au AFTER UPDATE OF status, category, location ON works '
+              f"BEGIN {facet_delta('OLD', -1)} {facet_delta('NEW', 1)} END")
+    m.execute('DELETE FROM work_facets')
+    for column in FACET_COLUMNS:
+        m.rows += m.count('works')
+        m.execute(f"INSERT INTO work_facets (facet, value, count) SELECT '{column}', {column}, COUNT(*) "
+                  f"FROM works WHERE status = 'VISIBLE' AND COALESCE({column}, '') <> '' GROUP BY {column}")
+
+
+WORK_COLUMNS = ('id', 'title', 'category', 'location', 'date', 'description', 'image', 'status',
+                'created_at', 'updated_at', 'sync_seq')
+WORKS_TABLE = '''
+    CREATE TABLE {table} (
+        id INTEGER NOT NULL PRIMARY KEY,
+        title VARCHAR(100) NOT NULL,
+        category VARCHAR(50),
+        location VARCHAR(100),
+        date DATE,
+        description TEXT,
+        image VARCHAR(255),
+        status VARCHAR(20),
+        created_at DATETIME,
+        updated_at VARCHAR(30),
+        sync_seq INTEGER
+    )'''
+
+
+@migration(8, 'Typed works.date/created_at columns and an event date index')
+def typed_work_dates(m):
+    if not m.has_table('works'):
+        return
+    date_index, created_index = WORK_COLUMNS.index('date'), WORK_COLUMNS.index('created_at')
+    unparsed = []
+
+    def convert(row):
+        row = list(row)
+        raw_date, raw_created = row[date_index], row[created_index]
+        try:
+            day = parse_date(raw_date)
+        except ValueError:
+            day = None
+            unparsed.append((row[0], 'date', raw_date))
+        try:
+            created = parse_datetime(raw_created)
+        except ValueError:
+            created = None
+            unparsed.append((row[0], 'created_at', raw_created))
+        # Legacy imports copied the event date into created_at and left date empty
+        if day is None and created is not None and len(str(raw_created).strip()) == 10:
+            day = created.date()
+        # Stored in the text formats SQLAlchemy's SQLite Date/DateTime types read back
+        row[date_index] = day.isoformat() if day else None
+        row[created_index] = created.strftime('%Y-%m-%d %H:%M:%S.%f') if created else None
+        return tuple(row)
+
+    m.rebuild_table('works', WORKS_TABLE, WORK_COLUMNS, transform=convert)
+    m.create_index('ix_works_status_date', 'works', 'status, date')
+    for work_id, column, value in unparsed[:20]:
+        m.log(f'  works {work_id}: could not parse {column} {value!r}; left empty')
+    if len(unparsed) > 20:
+        m.log(f'  ... and {len(unparsed) - 20} more unparseable values')
+
+
+@migration(9, 'Default NULL service orders to 0 for the (order, id) keyset')
+def service_order_defaults(m):
+    m.update_chunked('services', '"order" = 0', '"order" IS NULL')
+
+
+# --- Runner ---
+def connect(db_path):
+    conn = sqlite3.connect(db_path, isolation_level=None, timeout=30)
+    conn.execute('PRAGMA busy_timeout = 30000')
+    return conn
+
+
+def applied_versions(conn):
+    if not Migrator(conn).has_table('schema_version'):
+        return set()
+    return {row[0] for row in conn.execute('SELECT version FROM schema_version')}
+
+
+def run_migrations(db_path, dry_run=False, chunk_size=CHUNK_SIZE, log=print):
+    """Apply pending migrations in order. Returns [(migration, rows, seconds)]."""
+    conn = connect(db_path)
+    report = []
+    try:
+        if not dry_run:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS schema_version ('
+                'version INTEGER PRIMARY KEY, description TEXT NOT NULL, applied_at VARCHAR(50) NOT NULL)')
+        done = applied_versions(conn)
+        for step in MIGRATIONS:
+            if step.version in done:
+                continue
+            migrator = Migrator(conn, dry_run=dry_run, chunk_size=chunk_size, log=log)
+            started = time.perf_counter()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                step.apply(migrator)
+                if dry_run:
+                    conn.execute('ROLLBACK')
+                else:
+                    conn.execute('INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)',
+                                 (step.version, step.description, datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')))
+                    conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+            elapsed = time.perf_counter() - started
+            report.append((step, migrator.rows, elapsed))
+            verb = 'would touch' if dry_run else 'touched'
+            log(f'{step.version:04d} {step.description}: {verb} ~{migrator.rows} rows'
+                + ('' if dry_run else f' in {elapsed:.2f}s'))
+        if not report:
+            log('Schema is up to date.')
+    finally:
+        conn.close()
+    return report
+
+
+def print_status(db_path):
+    conn = connect(db_path)
+    try:
+        done = applied_versions(conn)
+    finally:
+        conn.close()
+    for step in MIGRATIONS:
+        print(f"{'applied' if step.version in done else 'pending'} {step.version:04d} {step.description}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Apply pending schema migrations.')
+    parser.add_argument('--db', default=DATABASE)
+    parser.add_argument('--dry-run', action='store_true', help='report estimated rows touched without writing')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--status', action='store_true', help='list applied and pending migrations')
+    args = parser.parse_args(argv)
+    if args.status:
+        print_status(args.db)
+    else:
+        run_migrations(args.db, dry_run=args.dry_run, chunk_size=args.chunk_size)
+
+
+if __name__ == '__main__':
+    main()
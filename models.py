@@ -25,6 +25,14 @@ class Service(db.Model):
     image = db.Column(db.String(255))
     status = db.Column(db.String(20), default='ACTIVE') # ACTIVE, INACTIVE
     order = db.Column(db.Integer, default=0)
+    # Maintained by the sync triggers (migration 6)
+    updated_at = db.Column(db.String(30))
+    sync_seq = db.Column(db.Integer)
+
+    __table_args__ = (
+        db.Index('ix_services_status_order', 'status', 'order'),
+        db.Index('ix_services_sync_seq', 'sync_seq'),
+    )
 
 class Work(db.Model):
     __tablename__ = 'works'
@@ -32,11 +40,21 @@ class Work(db.Model):
     title = db.Column(db.String(100), nullable=False)
     category = db.Column(db.String(50))
     location = db.Column(db.String(100))
-    date = db.Column(db.String(20))
+    date = db.Column(db.Date) # event date; typed since migration 8
     description = db.Column(db.Text)
     image = db.Column(db.String(255))
     status = db.Column(db.String(20), default='VISIBLE') # VISIBLE, HIDDEN
-    created_at = db.Column(db.String(50), default=lambda: datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.String(30))
+    sync_seq = db.Column(db.Integer)
+
+    __table_args__ = (
+        db.Index('ix_works_status_id', 'status', 'id'),
+        db.Index('ix_works_status_category_id', 'status', 'category', 'id'),
+        db.Index('ix_works_status_location_id', 'status', 'location', 'id'),
+        db.Index('ix_works_status_date', 'status', 'date'),
+        db.Index('ix_works_sync_seq', 'sync_seq'),
+    )
 
 class Enquiry(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -46,6 +64,30 @@ class Enquiry(db.Model):
     message = db.Column(db.Text, nullable=False)
     date = db.Column(db.DateTime, default=datetime.utcnow)
     status = db.Column(db.String(20), default='New') # New, Read, Replied
+    updated_at = db.Column(db.String(30))
+    sync_seq = db.Column(db.Integer)
+
+    __table_args__ = (
+        db.Index('ix_enquiry_sync_seq', 'sync_seq'),
+    )
+
+class Booking(db.Model):
+    __tablename__ = 'bookings'
+    id = db.Column(db.Integer, primary_key=True)
+    client_name = db.Column(db.String(100), nullable=False)
+    email = db.Column(db.String(120), nullable=False)
+    phone = db.Column(db.String(30))
+    event_type = db.Column(db.String(100))
+    start_date = db.Column(db.Date, nullable=False)
+    end_date = db.Column(db.Date, nullable=False) # inclusive; equals start_date for one-day events
+    location = db.Column(db.String(200))
+    details = db.Column(db.Text)
+    status = db.Column(db.String(20), default='Pending') # Pending, Approved, Rejected
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_bookings_start_end', 'start_date', 'end_date'),
+    )
 
 class Setting(db.Model):
     key = db.Column(db.String(50), primary_key=True)
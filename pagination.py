@@ -0,0 +1,105 @@
+import base64
+import json
+from datetime import date, datetime
+
+from flask import current_app, request
+from sqlalchemy import select
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    # Dates go out as ISO strings; the caller's after() parses them back
+    raw = json.dumps(values, separators=(',', ':'), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token, kinds):
+    """Cursor values, one per entry of kinds, each an instance of that type (or tuple of types)."""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = json.loads(raw)
+    except ValueError:
+        raise BadRequest('Invalid cursor')
+    if not isinstance(values, list) or len(values) != len(kinds) or not all(
+            isinstance(value, kind) and not isinstance(value, bool) for value, kind in zip(values, kinds)):
+        raise BadRequest('Invalid cursor')
+    return values
+
+
+def cursor_kind(column):
+    # Dates leave encode_cursor as ISO strings
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return (int, float, str)
+    if python_type is int:
+        return int
+    if python_type is float:
+        return (int, float)
+    if python_type in (str, date, datetime):
+        return str
+    return (int, float, str)
+
+
+def page_limit():
+    default = current_app.config.get('API_PAGE_SIZE', 100)
+    maximum = current_app.config.get('API_MAX_PAGE_SIZE', 500)
+    try:
+        limit = int(request.args.get('limit', default))
+    except ValueError:
+        raise BadRequest('limit must be an integer')
+    return max(1, min(limit, maximum))
+
+
+def requested_fields(field_map):
+    """Return the API field names selected by ?fields=, defaulting to all."""
+    fields = request.args.get('fields')
+    if not fields:
+        return list(field_map)
+    names = [name.strip() for name in fields.split(',') if name.strip()]
+    unknown = [name for name in names if name not in field_map]
+    if unknown:
+        raise BadRequest(f"Unknown fields: {', '.join(unknown)}")
+    if 'id' not in names:
+        names.insert(0, 'id')
+    return names
+
+
+def keyset_page(session, field_map, names, key_columns, filters, after, limit):
+    """Fetch one page ordered by key_columns, starting after the cursor.
+
+    field_map maps API names to (column, converter). Only the columns behind
+    the requested names plus the key columns are selected. after is a
+    callable turning decoded cursor values into a WHERE clause.
+    """
+    columns = []
+    for name in names:
+        column = field_map[name][0]
+        if column not in columns:
+            columns.append(column)
+    for column, _ in key_columns:
+        if column not in columns:
+            columns.append(column)
+
+    stmt = select(*columns).where(*filters)
+    cursor = request.args.get('cursor')
+    if cursor:
+        stmt = stmt.where(after(decode_cursor(cursor, [cursor_kind(column) for column, _ in key_columns])))
+    stmt = stmt.order_by(*[column.desc() if desc else column.asc() for column, desc in key_columns])
+    rows = session.execute(stmt.limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([last[columns.index(column)] for column, _ in key_columns])
+
+    positions = [(name, columns.index(field_map[name][0]), field_map[name][1]) for name in names]
+    items = [
+        {name: convert(row[index]) if convert else row[index] for name, index, convert in positions}
+        for row in rows
+    ]
+    return items, next_cursor
@@ -0,0 +1,227 @@
+from datetime import date
+from urllib.request import urlopen
+
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, flash
+from sqlalchemy import text
+
+from models import db, Service, Work
+from availability import create_booking
+from cache import content_cache, snapshot
+from ingest import enquiry_queue
+from jobs import job_queue, task
+from settings import site_settings
+
+bp = Blueprint('public', __name__)
+
+# --- Context Processor (Template Compatibility) ---
+@bp.app_context_processor
+def inject_settings():
+    # Cached per process until the settings version changes
+    return dict(site_settings=site_settings.all())
+
+# --- Cached Listings ---
+# Public listings are served from memory until the admin API bumps the content version
+def active_services(limit=None):
+    def load():
+        # Use EXACT status match as requested
+        query = Service.query.filter_by(status='ACTIVE').order_by(Service.order.asc())
+        if limit:
+            query = query.limit(limit)
+        return snapshot(query.all())
+    return content_cache.get(('services', limit), load)
+
+def visible_works(limit=None):
+    def load():
+        query = Work.query.filter_by(status='VISIBLE').order_by(Work.id.desc())
+        if limit:
+            query = query.limit(limit)
+        return snapshot(query.all())
+    return content_cache.get(('works', limit), load)
+
+def works_page(category=None, location=None, after=None, limit=24):
+    """One page of visible works, newest first. Returns (works, last id or None if no more)."""
+    query = Work.query.filter_by(status='VISIBLE')
+    # Each filter is served by its (status, column, id) index
+    if category:
+        query = query.filter_by(category=category)
+    if location:
+        query = query.filter_by(location=location)
+    if after:
+        query = query.filter(Work.id < after)
+    rows = query.order_by(Work.id.desc()).limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return snapshot(rows), rows[-1].id
+    return snapshot(rows), None
+
+def work_facets():
+    """{'category': [(value, count)], 'location': [...]} from the trigger-maintained summary table."""
+    def load():
+        facets = {'category': [], 'location': []}
+        rows = db.session.execute(text(
+            'SELECT facet, value, count FROM work_facets ORDER BY facet, count DESC, value'))
+        for facet, value, count in rows:
+            facets.setdefault(facet, []).append((value, count))
+        return facets
+    return content_cache.get(('work_facets',), load)
+
+def facet_links(facets, filters):
+    """Per facet: [(label, count, url, active)], starting with an 'All' link that clears it."""
+    links = {}
+    for facet, values in facets.items():
+        others = {name: value for name, value in filters.items() if value and name != facet}
+        links[facet] = [('All', None, url_for('public.works', **others), not filters.get(facet))] + [
+            (value, count, url_for('public.works', **others, **{facet: value}), filters.get(facet) == value)
+            for value, count in values]
+    return links
+
+# --- Cache Warming ---
+WARM_PATHS = ('/', '/services', '/works')
+
+def warm_pages():
+    # Saves in quick succession share one queued job; off unless CACHE_WARM_URL is set
+    if current_app.config.get('CACHE_WARM_URL'):
+        job_queue.enqueue('warm_pages', delay=2, unique=True)
+
+@task('warm_pages', max_attempts=3, backoff=10, lease=60)
+def warm_pages_job(payload):
+    # Page caches are per process, so this only refills the worker that answers
+    base = current_app.config.get('CACHE_WARM_URL')
+    if not base:
+        return
+    for path in current_app.config.get('CACHE_WARM_PATHS', WARM_PATHS):
+        with urlopen(base.rstrip('/') + path, timeout=10) as response:
+            response.read()
+
+# --- Public Routes ---
+@bp.route('/')
+@bp.route('/index.html')
+@content_cache.page
+def home():
+    services_data = active_services(limit=3)
+    works_data = visible_works(limit=3)
+    
+    return render_template('index.html', services=services_data, works=works_data)
+
+@bp.route('/about')
+@bp.route('/about.html')
+@content_cache.page
+def about():
+    return render_template('about.html')
+
+@bp.route('/services')
+@bp.route('/services.html')
+@content_cache.page
+def services():
+    # Fetch all ACTIVE services without limit, using models
+    services_data = active_services()
+    return render_template('services.html', services=services_data)
+
+@bp.route('/works')
+@bp.route('/events')
+@bp.route('/events.html')
+@bp.route('/works.html')
+@content_cache.page
+def works():
+    # Paginated by id; ?fragment=1 returns just the next cards for infinite scroll
+    filters = {name: request.args.get(name) or None for name in ('category', 'location')}
+    after = request.args.get('after', type=int)
+    works_data, last_id = works_page(after=after, limit=current_app.config.get('WORKS_PAGE_SIZE', 24), **filters)
+    next_url = None
+    if last_id is not None:
+        next_url = url_for('public.works', after=last_id, **{k: v for k, v in filters.items() if v})
+    if request.args.get('fragment'):
+        return render_template('partials/works_page.html', works=works_data, next_url=next_url)
+    return render_template('works.html', works=works_data, next_url=next_url,
+                           facet_links=facet_links(work_facets(), filters))
+
+def posted_fields():
+    """The form, or a JSON object of string fields; None for any other JSON body."""
+    data = request.get_json(silent=True)
+    if data is None:
+        return request.form
+    if not isinstance(data, dict) or not all(value is None or isinstance(value, str) for value in data.values()):
+        return None
+    return data
+
+@bp.route('/booking', methods=['GET', 'POST'])
+@bp.route('/booking.html', methods=['GET', 'POST'])
+@content_cache.page
+def booking():
+    if request.method == 'POST':
+        data = posted_fields()
+        wants_json = request.is_json or request.accept_mimetypes.best == 'application/json'
+
+        def reject(message, status=400):
+            if wants_json:
+                return {"status": "error", "message": message}, status
+            flash(message, 'error')
+            return redirect(url_for('public.booking'))
+
+        if data is None:
+            return reject('Booking details must be a JSON object of text fields.')
+        try:
+            start = date.fromisoformat(data.get('date') or '')
+            end = date.fromisoformat(data.get('end_date') or data.get('date'))
+        except (TypeError, ValueError):
+            return reject('Please choose a valid event date.')
+        if not (data.get('name') and data.get('email')):
+            return reject('Please fill in your name and email.')
+        if start < date.today() or end < start:
+            return reject('Please choose an upcoming event date.')
+        if (end - start).days >= current_app.config['BOOKING_MAX_DAYS']:
+            return reject('Bookings longer than %d days need to be arranged by phone.'
+                          % current_app.config['BOOKING_MAX_DAYS'])
+
+        booking, conflicts = create_booking(
+            db.session,
+            client_name=data.get('name'),
+            email=data.get('email'),
+            phone=data.get('phone'),
+            event_type=data.get('type'),
+            start_date=start,
+            end_date=end,
+            location=data.get('location'),
+            details=data.get('details'),
+            status='Pending')
+        if conflicts:
+            days = ', '.join(day.isoformat() for day in conflicts)
+            if wants_json:
+                return {"status": "unavailable", "dates": [day.isoformat() for day in conflicts]}, 409
+            return reject(f'Sorry, we are fully booked on {days}.', 409)
+
+        if wants_json:
+            return {"status": "success", "id": booking.id}, 201
+        flash('Thank you! Your inquiry has been received. We will contact you shortly.', 'success')
+        return redirect(url_for('public.booking'))
+    return render_template('booking.html')
+
+@bp.route('/contact', methods=['GET', 'POST'])
+@bp.route('/contact.html', methods=['GET', 'POST'])
+@content_cache.page
+def contact():
+    if request.method == 'POST':
+        data = posted_fields()
+        wants_json = request.is_json or request.accept_mimetypes.best == 'application/json'
+        if data is None:
+            return {"status": "error", "message": "Expected a JSON object of text fields"}, 400
+        name, email, message = data.get('name'), data.get('email'), data.get('message')
+        if not (name and email and message):
+            if wants_json:
+                return {"status": "error", "message": "name, email and message are required"}, 400
+            flash('Please fill in your name, email and message.', 'error')
+            return redirect(url_for('public.contact'))
+
+        # Queued for the background flusher; the response does not wait on SQLite
+        if not enquiry_queue.submit(name, email, data.get('subject'), message):
+            retry = {'Retry-After': '30'}
+            if wants_json:
+                return {"status": "busy", "message": "Too many enquiries, please retry shortly"}, 503, retry
+            flash('We are receiving a lot of messages right now. Please try again in a minute.', 'error')
+            return render_template('contact.html'), 503, retry
+
+        if wants_json:
+            return {"status": "accepted"}, 202
+        flash('Enquiry received!', 'success')
+        return redirect(url_for('public.contact'))
+    return render_template('contact.html')
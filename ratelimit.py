@@ -0,0 +1,104 @@
+"""Token-bucket rate limiting shared by every worker on the host.
+
+Buckets live in a small SQLite file of their own (WAL, no fsync), so all
+gunicorn workers draw from the same limits without touching the main
+database. Each check is one UPSERT ... RETURNING that refills the bucket
+for the time elapsed, takes a token if one is available and reports
+whether it did, atomically across processes.
+
+Limits are keyed by ``request.remote_addr``; behind a reverse proxy wrap
+``app.wsgi_app`` in werkzeug's ProxyFix so that is the client address.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+from flask import current_app
+
+TAKE_SQL = '''
+    INSERT INTO buckets (key, tokens, updated, allowed) VALUES (:key, :burst - 1, :now, 1)
+    ON CONFLICT (key) DO UPDATE SET
+        tokens = MIN(:burst, tokens + (:now - updated) * :rate)
+                 - (MIN(:burst, tokens + (:now - updated) * :rate) >= 1),
+        updated = :now,
+        allowed = MIN(:burst, tokens + (:now - updated) * :rate) >= 1
+    RETURNING tokens, allowed
+'''
+# Idle buckets refill completely, so dropping them changes nothing
+PRUNE_EVERY = 1000
+
+
+class _LimiterState:
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        self.calls = 0
+        os.register_at_fork(after_in_child=self.reset)
+
+    def reset(self):
+        self.local = threading.local()
+
+    def connection(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None, timeout=5)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS buckets (
+                    key TEXT NOT NULL PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated REAL NOT NULL,
+                    allowed INTEGER NOT NULL
+                ) WITHOUT ROWID''')
+            self.local.conn = conn
+        return conn
+
+
+class RateLimiter:
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        os.makedirs(app.instance_path, exist_ok=True)
+        path = app.config.setdefault('RATE_LIMIT_DB', os.path.join(app.instance_path, 'ratelimit.db'))
+        app.config.setdefault('LOGIN_IP_BURST', 10)
+        app.config.setdefault('LOGIN_IP_PER_MINUTE', 5)
+        app.config.setdefault('LOGIN_USER_BURST', 5)
+        app.config.setdefault('LOGIN_USER_PER_MINUTE', 2)
+        app.extensions['rate_limiter'] = _LimiterState(path)
+
+    @property
+    def _state(self):
+        return current_app.extensions['rate_limiter']
+
+    def take(self, kind, ident, burst, per_minute):
+        """Take one token from the kind:ident bucket. Returns 0 if allowed, else seconds until one frees up."""
+        state = self._state
+        rate = per_minute / 60.0
+        now = time.time()
+        conn = state.connection()
+        tokens, allowed = conn.execute(
+            TAKE_SQL, {'key': f'{kind}:{ident}', 'burst': burst, 'rate': rate, 'now': now}).fetchone()
+        state.calls += 1
+        if state.calls % PRUNE_EVERY == 0:
+            # Every key of this kind shares its burst and rate; ':' < ';' bounds the prefix
+            conn.execute('DELETE FROM buckets WHERE key >= ? AND key < ? AND tokens + (? - updated) * ? >= ?',
+                         (f'{kind}:', f'{kind};', now, rate, burst))
+        if allowed:
+            return 0
+        return max(1, int((1 - tokens) / rate + 0.999))
+
+    def login_attempt(self, ip, username):
+        """Charge a login attempt to the IP and username buckets. Returns seconds to wait, 0 if allowed."""
+        config = current_app.config
+        wait = self.take('login-ip', ip, config['LOGIN_IP_BURST'], config['LOGIN_IP_PER_MINUTE'])
+        if wait:
+            return wait
+        return self.take('login-user', (username or '').lower(),
+                         config['LOGIN_USER_BURST'], config['LOGIN_USER_PER_MINUTE'])
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,60 @@
+"""Ranked full-text search over the FTS5 indexes built by migration 5.
+
+Each index is an external-content FTS5 table over its source table, kept in
+sync by triggers, so a search reads only the index and then fetches the
+matching rows by primary key.
+"""
+import re
+from html import escape
+
+from sqlalchemy import text
+
+from pagination import BadRequest
+
+# kind -> (fts table, bm25 column weights); titles and subjects outrank body text
+SEARCH_INDEXES = {
+    'works': ('works_fts', (10.0, 2.0, 1.0, 3.0)),
+    'services': ('services_fts', (10.0, 3.0, 1.0)),
+    'enquiries': ('enquiry_fts', (3.0, 3.0, 5.0, 1.0)),
+}
+
+SNIPPET_TOKENS = 12
+
+
+def match_expression(query):
+    """Turn free text into an FTS5 query: every word must match as a prefix."""
+    words = re.findall(r'\w+', query or '')
+    if not words:
+        raise BadRequest('q must contain at least one word')
+    return ' '.join(f'"{word}"*' for word in words[:16])
+
+
+def search_index(session, kind, query, limit, offset=0):
+    """Return [(rowid, snippet, score)] best match first. Lower scores rank higher."""
+    fts, weights = SEARCH_INDEXES[kind]
+    rows = session.execute(text(
+        f"SELECT rowid, snippet({fts}, -1, char(2), char(3), '…', {SNIPPET_TOKENS}), "
+        f"bm25({fts}, {', '.join(str(w) for w in weights)}) AS score "
+        f"FROM {fts} WHERE {fts} MATCH :q ORDER BY score LIMIT :limit OFFSET :offset"),
+        {'q': match_expression(query), 'limit': limit, 'offset': offset}).all()
+    return [(rowid, highlight(snippet), score) for rowid, snippet, score in rows]
+
+
+def highlight(snippet):
+    # Matches are delimited with control characters so the text can be escaped first
+    return escape(snippet or '').replace('\x02', '<mark>').replace('\x03', '</mark>')
+
+
+def search(session, kinds, query, limit, offset=0):
+    """Search several indexes and merge them by score.
+
+    Returns ([(kind, rowid, snippet, score)], has_more).
+    """
+    if len(kinds) == 1:
+        rows = search_index(session, kinds[0], query, limit + 1, offset)
+        return [(kinds[0],) + row for row in rows[:limit]], len(rows) > limit
+    hits = []
+    for kind in kinds:
+        hits.extend((kind,) + row for row in search_index(session, kind, query, offset + limit + 1))
+    hits.sort(key=lambda hit: hit[3])
+    return hits[offset:offset + limit], len(hits) > offset + limit
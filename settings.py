@@ -0,0 +1,86 @@
+"""Site settings stored in the ``setting`` table and cached per process.
+
+Each worker loads every row once and keeps the dict until the settings
+version stamp changes, so template rendering costs a file read and a dict
+lookup. Saving settings bumps the stamp, which also changes the cache key
+of rendered public pages.
+"""
+import hashlib
+import os
+import threading
+
+from flask import current_app
+
+from cache import VersionStamp, content_cache
+from models import db, Setting
+from pagination import BadRequest
+
+DEFAULTS = {
+    'siteName': 'Ap Events',
+    'footerText': 'Creating timeless memories with elegance and style.',
+    'phone': '+1 (555) 123-4567',
+    'email': 'info@apevents.com',
+    'address': '123 Luxury Lane, Event City',
+}
+
+KEYS = ('siteName', 'heroHeadline', 'heroSubtext', 'phone', 'email', 'address',
+        'mapUrl', 'footerText', 'facebook', 'instagram', 'twitter')
+
+
+class _SettingsState:
+    def __init__(self, stamp):
+        self.stamp = stamp
+        self.version = None
+        self.values = None
+        self.lock = threading.Lock()
+
+
+class SiteSettings:
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        os.makedirs(app.instance_path, exist_ok=True)
+        path = app.config.setdefault(
+            'SETTINGS_VERSION_FILE', os.path.join(app.instance_path, 'settings.version'))
+        stamp = VersionStamp(path)
+        app.extensions['site_settings'] = _SettingsState(stamp)
+        content_cache.add_page_dependency(app, stamp)
+
+    @property
+    def _state(self):
+        return current_app.extensions['site_settings']
+
+    def version(self):
+        return self._state.stamp.current()
+
+    def etag(self):
+        return hashlib.blake2b(f'settings:{self.version()}'.encode(), digest_size=12).hexdigest()
+
+    def all(self):
+        """Current settings; blank values fall back to DEFAULTS."""
+        state = self._state
+        version = state.stamp.current()
+        if state.version != version:
+            with state.lock:
+                if state.version != version:
+                    stored = {row.key: row.value for row in Setting.query.all()}
+                    state.values = dict(DEFAULTS, **{key: value for key, value in stored.items() if value})
+                    state.version = version
+        return state.values
+
+    def update(self, values):
+        unknown = [key for key in values if key not in KEYS]
+        if unknown:
+            raise BadRequest(f"Unknown settings: {', '.join(unknown)}")
+        invalid = [key for key, value in values.items() if value is not None and not isinstance(value, str)]
+        if invalid:
+            raise BadRequest(f"Settings must be strings: {', '.join(invalid)}")
+        for key, value in values.items():
+            db.session.merge(Setting(key=key, value=(value or '').strip()))
+        db.session.commit()
+        return self._state.stamp.bump()
+
+
+site_settings = SiteSettings()
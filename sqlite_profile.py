@@ -0,0 +1,71 @@
+import os
+import weakref
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+# Applied to every new connection. WAL lets public readers keep going while
+# an admin write commits, and busy_timeout makes writers wait for the lock
+# instead of failing with "database is locked".
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'busy_timeout': 5000,         # ms
+    'synchronous': 'NORMAL',      # durable with WAL, fsync only at checkpoints
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -16000,         # negative means KiB, so ~16 MB per connection
+    'temp_store': 'MEMORY',
+}
+
+# Engines set up by init_app; weak, so apps built and dropped by scripts don't leak
+_engines = weakref.WeakSet()
+
+
+def _dispose_after_fork():
+    # A preloaded app must not hand the parent's open connections to workers
+    for engine in list(_engines):
+        engine.dispose(close=False)
+
+
+os.register_at_fork(after_in_child=_dispose_after_fork)
+
+
+def engine_options(uri, config):
+    """Pool sizing for a file-backed SQLite database.
+
+    Each gunicorn worker owns its own pool, so the pool only needs to cover
+    the threads inside one worker. Connections are never shared across a
+    fork (see init_app).
+    """
+    url = make_url(uri)
+    if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:'):
+        return {}
+    return {
+        'pool_size': int(config.get('SQLITE_POOL_SIZE', 5)),
+        'max_overflow': int(config.get('SQLITE_MAX_OVERFLOW', 5)),
+        'pool_timeout': int(config.get('SQLITE_POOL_TIMEOUT', 10)),
+    }
+
+
+def apply_pragmas(engine, pragmas):
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+
+def init_app(app, db):
+    """Install the SQLite profile on the app's engine.
+
+    Must run after db.init_app(app), which creates the engine.
+    """
+    pragmas = dict(DEFAULT_PRAGMAS)
+    pragmas.update(app.config.get('SQLITE_PRAGMAS', {}))
+    app.config['SQLITE_PRAGMAS'] = pragmas
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name != 'sqlite':
+        return
+    apply_pragmas(engine, pragmas)
+    _engines.add(engine)
@@ -16,30 +16,111 @@ document.addEventListener('DOMContentLoaded', () => {
     // Booking Form Handling
     const bookingForm = document.querySelector('.booking-form');
     if (bookingForm) {
-        bookingForm.addEventListener('submit', (e) => {
+        bookingForm.addEventListener('submit', async (e) => {
             e.preventDefault();
-            // Simulate form submission
             const successMsg = document.getElementById('booking-success');
-            successMsg.style.display = 'block';
-            bookingForm.reset();
-            setTimeout(() => {
-                successMsg.style.display = 'none';
-            }, 5000);
+            const dateNotice = document.getElementById('date-availability');
+            try {
+                const response = await fetch(bookingForm.action, {
+                    method: 'POST',
+                    headers: { 'Accept': 'application/json' },
+                    body: new FormData(bookingForm)
+                });
+                const result = await response.json();
+                if (response.ok) {
+                    successMsg.style.display = 'block';
+                    bookingForm.reset();
+                    setTimeout(() => {
+                        successMsg.style.display = 'none';
+                    }, 5000);
+                } else if (dateNotice) {
+                    dateNotice.textContent = result.status === 'unavailable'
+                        ? 'Sorry, we are fully booked on ' + result.dates.join(', ') + '.'
+                        : result.message;
+                    dateNotice.style.display = 'block';
+                }
+            } catch (err) {
+                console.error("Failed to submit booking:", err);
+            }
         });
     }
 
     // Contact Form Handling
     const contactForm = document.querySelector('.contact-form form');
     if (contactForm) {
-        contactForm.addEventListener('submit', (e) => {
+        contactForm.addEventListener('submit', async (e) => {
             e.preventDefault();
-            // Simulate form submission
             const successMsg = document.getElementById('contact-success');
-            successMsg.style.display = 'block';
-            contactForm.reset();
-            setTimeout(() => {
-                successMsg.style.display = 'none';
-            }, 5000);
+            const errorMsg = document.getElementById('contact-error');
+            errorMsg.style.display = 'none';
+            try {
+                const response = await fetch(contactForm.action, {
+                    method: 'POST',
+                    headers: { 'Accept': 'application/json' },
+                    body: new FormData(contactForm)
+                });
+                const result = await response.json();
+                if (response.status === 202) {
+                    successMsg.style.display = 'block';
+                    contactForm.reset();
+                    setTimeout(() => {
+                        successMsg.style.display = 'none';
+                    }, 5000);
+                    return;
+                }
+                let message = result.message || 'Sorry, your message could not be sent.';
+                const retryAfter = response.headers.get('Retry-After');
+                if (response.status === 503 && retryAfter) {
+                    message += ` (try again in ${retryAfter} seconds)`;
+                }
+                errorMsg.textContent = message;
+                errorMsg.style.display = 'block';
+            } catch (err) {
+                console.error("Failed to send enquiry:", err);
+                errorMsg.textContent = 'Sorry, your message could not be sent. Please try again.';
+                errorMsg.style.display = 'block';
+            }
         });
     }
+
+    // Portfolio infinite scroll: append the next page's cards as an HTML fragment
+    const worksGrid = document.getElementById('works-page-grid');
+    if (worksGrid) {
+        let loading = false;
+        const loadMore = async (link) => {
+            if (loading) return;
+            loading = true;
+            const url = new URL(link.href, window.location.href);
+            url.searchParams.set('fragment', '1');
+            try {
+                const response = await fetch(url);
+                if (!response.ok) throw new Error(response.status);
+                const html = await response.text();
+                link.closest('.works-pager').remove();
+                worksGrid.insertAdjacentHTML('beforeend', html);
+                observeMore();
+            } catch (err) {
+                console.error("Failed to load more works:", err);
+            } finally {
+                loading = false;
+            }
+        };
+        const observer = 'IntersectionObserver' in window
+            ? new IntersectionObserver(entries => entries.forEach(entry => {
+                if (entry.isIntersecting) loadMore(entry.target);
+            }), { rootMargin: '600px' })
+            : null;
+        const observeMore = () => {
+            const link = worksGrid.querySelector('.works-pager .load-more');
+            if (link && observer) observer.observe(link);
+        };
+        worksGrid.addEventListener('click', (e) => {
+            const link = e.target.closest('.load-more');
+            if (link) {
+                e.preventDefault();
+                loadMore(link);
+            }
+        });
+        observeMore();
+    }
 });
@@ -59,6 +59,46 @@ const ServicesData = {
         return service;
     },
 
+    // Save several changes in one request: { upserts: [...], deletes: [ids], order: [{ id, order }] }
+    async saveBatch(changes) {
+        const response = await fetch('/api/services/batch', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(changes)
+        });
+        const result = await response.json();
+        if (result.status !== 'success') {
+            console.error("Batch save failed:", result.results);
+            return result;
+        }
+
+        // Swap temporary ids for the ids assigned by the server
+        const assigned = {};
+        result.results.forEach(r => {
+            if (r.tempId) assigned[r.tempId] = r.id;
+        });
+
+        let items = this.getAll();
+        (changes.upserts || []).forEach(upsert => {
+            const service = { ...upsert, id: assigned[upsert.id] || upsert.id };
+            const index = items.findIndex(i => i.id == upsert.id);
+            if (index >= 0) {
+                items[index] = service;
+            } else {
+                items.push(service);
+            }
+        });
+        (changes.order || []).forEach(({ id, order }) => {
+            const item = items.find(i => i.id == id);
+            if (item) item.order = order;
+        });
+        const deleted = (changes.deletes || []).map(String);
+        items = items.filter(i => !deleted.includes(String(i.id)));
+
+        localStorage.setItem('siteServices', JSON.stringify(items));
+        return result;
+    },
+
     // Delete a service
     async delete(id) {
         try {
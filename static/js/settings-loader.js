@@ -1,7 +1,8 @@
 
 /**
  * Settings Loader
- * Loads website settings from localStorage and applies them to specific DOM elements.
+ * Loads website settings from /api/settings and applies them to specific DOM elements.
+ * The response carries an ETag, so repeat loads are a 304 revalidation.
  * 
  * Target Elements ID guide:
  * - site-name: Website Title
@@ -21,11 +22,13 @@ document.addEventListener('DOMContentLoaded', () => {
     loadSettings();
 });
 
-function loadSettings() {
-    const settings = JSON.parse(localStorage.getItem('siteSettings'));
-
-    if (!settings) {
-        // Default settings if nothing saved
+async function loadSettings() {
+    let settings;
+    try {
+        const response = await fetch('/api/settings');
+        settings = await response.json();
+    } catch (e) {
+        console.error("Failed to load settings:", e);
         return;
     }
 
@@ -58,6 +58,42 @@ const WorksData = {
         return work;
     },
 
+    // Save several changes in one request: { upserts: [...], deletes: [ids] }
+    async saveBatch(changes) {
+        const response = await fetch('/api/works/batch', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(changes)
+        });
+        const result = await response.json();
+        if (result.status !== 'success') {
+            console.error("Batch save failed:", result.results);
+            return result;
+        }
+
+        // Swap temporary ids for the ids assigned by the server
+        const assigned = {};
+        result.results.forEach(r => {
+            if (r.tempId) assigned[r.tempId] = r.id;
+        });
+
+        let items = this.getAll();
+        (changes.upserts || []).forEach(upsert => {
+            const work = { ...upsert, id: assigned[upsert.id] || upsert.id };
+            const index = items.findIndex(i => i.id == upsert.id);
+            if (index >= 0) {
+                items[index] = work;
+            } else {
+                items.push(work);
+            }
+        });
+        const deleted = (changes.deletes || []).map(String);
+        items = items.filter(i => !deleted.includes(String(i.id)));
+
+        localStorage.setItem('siteWorks', JSON.stringify(items));
+        return result;
+    },
+
     // Delete
     async delete(id) {
         try {
@@ -0,0 +1,50 @@
+"""Change tracking for the admin SPA's delta sync.
+
+Migration 6 adds triggers that stamp every inserted or updated row of the
+synced tables with ``updated_at`` and a ``sync_seq`` drawn from the
+single-row ``sync_clock`` counter, and that record deletes in
+``sync_tombstones`` under the next sequence number. SQLite serializes
+writers, so sequence numbers become visible in increasing order and a
+client that has seen everything up to N only needs rows with a higher one.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, text
+
+SYNC_TABLES = ('services', 'works', 'enquiry')
+
+
+def clock(session):
+    """Return (latest sequence number, highest pruned tombstone)."""
+    return tuple(session.execute(text('SELECT seq, pruned_seq FROM sync_clock WHERE id = 1')).one())
+
+
+def changed_rows(session, model, columns, since, limit):
+    """Rows of model changed after since, oldest change first: [(seq, row)]."""
+    rows = session.execute(
+        select(model.sync_seq, *columns)
+        .where(model.sync_seq > since)
+        .order_by(model.sync_seq)
+        .limit(limit)
+    ).all()
+    return [(row[0], row[1:]) for row in rows]
+
+
+def deleted_ids(session, table, since, limit):
+    """Tombstones for table after since: [(seq, row_id)]."""
+    return [tuple(row) for row in session.execute(text(
+        'SELECT seq, row_id FROM sync_tombstones WHERE table_name = :table AND seq > :since '
+        'ORDER BY seq LIMIT :limit'), {'table': table, 'since': since, 'limit': limit})]
+
+
+def prune_tombstones(session, days):
+    """Forget deletes older than days. Clients behind them must resync in full."""
+    cutoff = (datetime.utcnow() - timedelta(days=days)).strftime('%Y-%m-%dT%H:%M:%S')
+    pruned = session.execute(text(
+        'SELECT MAX(seq), COUNT(*) FROM sync_tombstones WHERE deleted_at < :cutoff'), {'cutoff': cutoff}).one()
+    if pruned[1]:
+        session.execute(text('DELETE FROM sync_tombstones WHERE seq <= :seq'), {'seq': pruned[0]})
+        session.execute(text('UPDATE sync_clock SET pruned_seq = MAX(pruned_seq, :seq) WHERE id = 1'),
+                        {'seq': pruned[0]})
+    session.commit()
+    return pruned[1]
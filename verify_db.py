@@ -1,13 +1,16 @@
-from app import app, init_db, DATABASE
+from app import app, init_db
+from models import db
 import sqlite3
 import os
 
 def verify():
-    print(f"Target Database: {DATABASE}")
-    
-    # Trigger initialization from app.py
-    print("Re-initializing database via app.init_db()...")
-    init_db()
+    with app.app_context():
+        DATABASE = db.engine.url.database
+        print(f"Target Database: {DATABASE}")
+
+        # Schema creation is explicit now that app.py no longer runs it on import
+        print("Re-initializing database via app.init_db()...")
+        init_db()
 
     if not os.path.exists(DATABASE):
         print(f"Error: {DATABASE} still does not exist after init_db().")